@@ -0,0 +1,148 @@
+"""
+Object pool for asyncio applications. Waiting for a connection suspends only the current coroutine,
+not the whole event loop.
+
+Waiters are served in FIFO order: a returned connection is handed over directly to the longest waiting coroutine,
+so a newcomer can't take it first and no waiter starves under contention.
+"""
+
+import asyncio
+import contextlib
+from collections import deque
+from typing import Self, Any, AsyncIterator
+
+from src.creational.connections import AsyncConnection
+from src.creational.pool import EmptyPoolError
+
+
+class AsyncConnectionPool:
+    def __init__(
+        self,
+        connection_class: type[AsyncConnection],
+        pool_size: int = 5,
+        *,
+        min_size: int = 0,
+    ):
+        if not 0 <= min_size <= pool_size:
+            raise ValueError("min_size must be between 0 and pool_size")
+        self.connection_class = connection_class
+        self.min_size = min_size
+        self.max_size = pool_size
+        # Number of open connections, both idle and in use
+        self.size = 0
+        self._idle: deque[AsyncConnection] = deque()
+        # A waiter receives a connection or None, which means a free slot to open a new connection in
+        self._waiters: deque[asyncio.Future[AsyncConnection | None]] = deque()
+
+    async def open(self) -> None:
+        """Pre-warm the pool up to `min_size` connections."""
+        missing = max(self.min_size - self.size, 0)
+        self.size += missing
+        results = await asyncio.gather(
+            *(self._open() for _ in range(missing)), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, AsyncConnection):
+                self._hand_over(result)
+            else:
+                self._release_slot()
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def _open(self) -> AsyncConnection:
+        connection = self.connection_class()
+        await connection.connect()
+        return connection
+
+    async def connect(self, timeout: float | None = 0) -> AsyncConnection:
+        """
+        Take a connection from the pool. If the pool is drained, wait up to `timeout` seconds
+        (0 - fail at once, None - wait forever) and raise EmptyPoolError after that.
+        """
+        connection: AsyncConnection | None
+        if self._idle and not self._waiters:
+            return self._idle.pop()
+        if self.size < self.max_size and not self._waiters:
+            self.size += 1
+        elif timeout is not None and timeout <= 0:
+            raise EmptyPoolError
+        else:
+            connection = await self._wait(timeout)
+            if connection is not None:
+                return connection
+        # We own a free slot, open a new connection in it
+        try:
+            return await self._open()
+        except BaseException:
+            self._release_slot()
+            raise
+
+    async def _wait(self, timeout: float | None) -> AsyncConnection | None:
+        waiter: asyncio.Future[AsyncConnection | None]
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            async with asyncio.timeout(timeout):
+                return await waiter
+        except BaseException as e:
+            with contextlib.suppress(ValueError):
+                self._waiters.remove(waiter)
+            if waiter.done() and not waiter.cancelled():
+                # Timed out or cancelled right after the hand-over, pass it on
+                connection = waiter.result()
+                if connection is None:
+                    self._release_slot()
+                else:
+                    self._hand_over(connection)
+            if isinstance(e, TimeoutError):
+                raise EmptyPoolError from None
+            raise
+
+    def _hand_over(self, connection: AsyncConnection) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(connection)
+                return
+        self._idle.append(connection)
+
+    def _release_slot(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.size -= 1
+
+    async def disconnect(self, connection: AsyncConnection) -> None:
+        self._hand_over(connection)
+
+    @contextlib.asynccontextmanager
+    async def acquire(
+        self, timeout: float | None = 0
+    ) -> AsyncIterator[AsyncConnection]:
+        """Borrow a connection and give it back to the pool on exit."""
+        connection = await self.connect(timeout)
+        try:
+            yield connection
+        finally:
+            await self.disconnect(connection)
+
+    async def dispose(self) -> None:
+        connections = list(self._idle)
+        self._idle.clear()
+        self.size -= len(connections)
+        await asyncio.gather(*(conn.disconnect() for conn in connections))
+
+    def empty(self) -> bool:
+        return not self._idle
+
+    async def __aenter__(self) -> Self:
+        await self.open()
+        return self
+
+    async def __aexit__(
+        self, exc_type: Any, exc_val: Any, exc_tb: Any
+    ) -> None:
+        await self.dispose()
@@ -0,0 +1,29 @@
+"""
+Scripts comparing the patterns with their naive versions, run them as `python -m src.creational.benchmarks.<name>`.
+"""
+
+import time
+from typing import Callable
+
+
+def timed[ReturnT](
+    func: Callable[[], ReturnT], number: int = 1
+) -> tuple[ReturnT, float]:
+    """Call `func` `number` times, return the last result and the total time in seconds."""
+    start = time.perf_counter()
+    for _ in range(number - 1):
+        func()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def measure[ReturnT](
+    name: str, func: Callable[[], ReturnT], number: int = 1
+) -> ReturnT:
+    """Time `func`, print the result under `name` and return what `func` returned."""
+    result, elapsed = timed(func, number)
+    if number == 1:
+        print(f"{name}: {elapsed:.3f} s")
+    else:
+        print(f"{name}: {elapsed / number * 1e6:.3f} µs per call")
+    return result
@@ -0,0 +1,30 @@
+import random
+
+from src.creational import binary
+from src.creational.benchmarks import measure
+from src.creational.products import Apple, Orange, Product
+
+NUMBER = 200_000
+
+
+def main() -> None:
+    products: list[Product] = [
+        random.choice((Apple, Orange))(price=round(random.uniform(0.5, 3), 2))
+        for _ in range(NUMBER)
+    ]
+    json_data = measure("JSON encode", lambda: Product.dumps_many(products))
+    binary_data = measure("Binary encode", lambda: binary.dumps(products))
+    print(
+        f"Size: JSON {len(json_data)} bytes, binary {len(binary_data)} bytes"
+    )
+    measure("JSON decode", lambda: Product.loads_many(json_data))
+    buffer = binary.loads(binary_data)
+    measure("Binary decode", lambda: list(buffer))
+    measure(
+        "Binary total price", lambda: sum(map(buffer.price, range(NUMBER)))
+    )
+    measure("Binary random access", lambda: buffer[NUMBER // 2])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import random
+
+from src.creational import columnar
+from src.creational.benchmarks import measure
+from src.creational.columnar import ColumnarShelf
+from src.creational.products import Apple, Orange, Product
+
+NUMBER = 1_000_000
+
+
+def discount(products: list[Product], rate: float) -> None:
+    for product in products:
+        product.price *= 1 - rate
+
+
+def main() -> None:
+    products: list[Product] = [
+        random.choice((Apple, Orange))(price=random.uniform(0.5, 3))
+        for _ in range(NUMBER)
+    ]
+    shelf = ColumnarShelf.from_products("fruits", products)
+    print(f"NumPy: {'yes' if columnar.np is not None else 'no'}")
+
+    measure("Objects: total", lambda: sum(p.price for p in products))
+    measure("Columns: total", shelf.total)
+    measure("Objects: max", lambda: max(p.price for p in products))
+    measure("Columns: max", shelf.max_price)
+    measure(
+        "Objects: filter",
+        lambda: [p for p in products if 1 <= p.price <= 2],
+    )
+    measure("Columns: filter", lambda: shelf.filter(1, 2))
+    measure("Objects: discount", lambda: discount(products, 0.1))
+    measure("Columns: discount", lambda: shelf.discount(0.1))
+
+
+if __name__ == "__main__":
+    main()
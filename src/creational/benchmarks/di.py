@@ -0,0 +1,87 @@
+import inspect
+from typing import Any, Callable
+
+from src.creational.benchmarks import timed
+from src.creational.di import Container
+
+
+class Config:
+    pass
+
+
+class Engine:
+    def __init__(self, config: Config) -> None:
+        self.config = config
+
+
+class Repository:
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+
+
+class Cache:
+    def __init__(self, config: Config) -> None:
+        self.config = config
+
+
+class Service:
+    def __init__(self, repository: Repository, cache: Cache) -> None:
+        self.repository = repository
+        self.cache = cache
+
+
+class Handler:
+    def __init__(self, service: Service, cache: Cache) -> None:
+        self.service = service
+        self.cache = cache
+
+
+NUMBER = 10_000
+
+
+def direct() -> Handler:
+    return Handler(
+        Service(Repository(Engine(Config())), Cache(Config())),
+        Cache(Config()),
+    )
+
+
+def reflective(container: Container, interface: type[Any]) -> Any:
+    """Resolution as it was before compile(): inspect the signature on every call."""
+    parameters = inspect.signature(interface).parameters
+    args = {
+        name: reflective(container, param.annotation)
+        for name, param in parameters.items()
+        if param.annotation in container._providers
+    }
+    return interface(**args)
+
+
+def compare(
+    name: str, func: Callable[[], Any], baseline: float | None = None
+) -> float:
+    _, elapsed = timed(func, NUMBER)
+    result = f"{name}: {elapsed / NUMBER * 1e6:.2f} µs per resolution"
+    if baseline is not None:
+        result += f" ({elapsed / baseline:.1f}x of direct calls)"
+    print(result)
+    return elapsed
+
+
+def main() -> None:
+    container = Container()
+    for cls in (Config, Engine, Repository, Cache, Service, Handler):
+        container.register(cls)
+    container.compile()
+
+    baseline = compare("Direct constructor calls", direct)
+    compare(
+        "Reflection on every resolve",
+        lambda: reflective(container, Handler),
+        baseline,
+    )
+    compare("Compiled container", lambda: container.resolve(Handler), baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import inspect
+from typing import Any, Callable
+
+from src.creational.benchmarks import measure
+from src.creational.di import Container
+from src.creational.di_example import UserService, container
+
+NUMBER = 100_000
+
+
+def reflective_inject[ReturnT](
+    container: Container, func: Callable[..., ReturnT]
+) -> Callable[..., ReturnT]:
+    """The wrapper as it was before: reflection on every call."""
+
+    def wrapper(*args: Any, **kwargs: Any) -> ReturnT:
+        annotations = inspect.getfullargspec(func).annotations
+        annotations.pop("return", None)
+        resolved_args = {
+            name: container.resolve(param_type)
+            for name, param_type in annotations.items()
+            if param_type in container._providers and name not in kwargs
+        }
+        return func(*args, **resolved_args, **kwargs)
+
+    return wrapper
+
+
+def say_hello(id: int, service: UserService) -> str:
+    return service.say_hello(id)
+
+
+def main() -> None:
+    reflective = reflective_inject(container, say_hello)
+    planned = container.inject(say_hello)
+    measure("Reflection on every call", lambda: reflective(1), NUMBER)
+    measure("Planned injection", lambda: planned(1), NUMBER)
+
+
+if __name__ == "__main__":
+    main()
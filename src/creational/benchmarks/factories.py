@@ -0,0 +1,38 @@
+from src.creational.benchmarks import measure
+from src.creational.factories import ProductRegistryFactory
+from src.creational.products import Apple
+
+NUMBER = 1_000_000
+# Price history the constructor averages, the "do some more stuff" part of a factory
+HISTORY = [0.99 + i / 1000 for i in range(50)]
+
+
+def make_apple() -> Apple:
+    apple = Apple()
+    apple.price = round(sum(HISTORY) / len(HISTORY), 2)
+    return apple
+
+
+def simulate(factory: ProductRegistryFactory) -> None:
+    """Short-lived products: every one is priced and thrown away."""
+    for _ in range(NUMBER):
+        apple = factory.make("apple")
+        apple.price *= 1.1
+        factory.release("apple", apple)
+
+
+def main() -> None:
+    factory = ProductRegistryFactory()
+    factory.register("apple", make_apple)
+    measure("Constructor", lambda: [make_apple() for _ in range(NUMBER)])
+    measure("make", lambda: [factory.make("apple") for _ in range(NUMBER)])
+    measure("make_many", lambda: factory.make_many("apple", NUMBER))
+
+    measure("Simulation without recycling", lambda: simulate(factory))
+    recycling = ProductRegistryFactory(max_free=16)
+    recycling.register("apple", make_apple)
+    measure("Simulation with recycling", lambda: simulate(recycling))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+from typing import Callable
+
+from src.creational.benchmarks import timed
+from src.creational.connections import MockConnection
+
+QUERIES = [f"SELECT * FROM products WHERE id = {i % 10}" for i in range(200)]
+LATENCY = 0.001
+
+
+def one_by_one(connection: MockConnection) -> None:
+    for query in QUERIES:
+        connection.execute_query(query)
+
+
+def batched(connection: MockConnection) -> None:
+    connection.execute_many(QUERIES)
+
+
+def pipelined(connection: MockConnection) -> None:
+    with connection.pipeline(batch_size=50) as pipeline:
+        for query in QUERIES:
+            pipeline.execute(query)
+
+
+def run(name: str, func: Callable[[MockConnection], None]) -> None:
+    connection = MockConnection(latency=LATENCY)
+    _, elapsed = timed(lambda: func(connection))
+    print(
+        f"{name}: {elapsed:.4f} s, "
+        f"{connection.round_trips} round trips for {len(QUERIES)} queries"
+    )
+
+
+def main() -> None:
+    run("One by one", one_by_one)
+    run("Batch", batched)
+    run("Pipeline", pipelined)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import threading
+
+from src.creational.benchmarks import timed
+from src.creational.connections import MockConnection
+from src.creational.pool import ConnectionPool
+
+ITERATIONS = 20_000
+
+
+def worker(pool: ConnectionPool, iterations: int) -> None:
+    for _ in range(iterations):
+        connection = pool.connect(timeout=None)
+        pool.disconnect(connection)
+
+
+def run(threads_count: int, thread_affinity: bool) -> float:
+    pool = ConnectionPool(
+        MockConnection, threads_count, thread_affinity=thread_affinity
+    )
+    iterations = ITERATIONS // threads_count
+    threads = [
+        threading.Thread(target=worker, args=(pool, iterations))
+        for _ in range(threads_count)
+    ]
+
+    def start_and_join() -> None:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    _, elapsed = timed(start_and_join)
+    pool.dispose()
+    return elapsed
+
+
+def main() -> None:
+    for threads_count in (1, 8, 64):
+        shared = run(threads_count, thread_affinity=False)
+        affinity = run(threads_count, thread_affinity=True)
+        print(
+            f"{threads_count} threads: shared queue {shared:.4f} s, "
+            f"thread affinity {affinity:.4f} s "
+            f"({shared / affinity:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
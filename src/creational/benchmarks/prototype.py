@@ -0,0 +1,36 @@
+import copy
+
+from src.creational.benchmarks import measure
+from src.creational.products import Apple, Orange
+from src.creational.prototype import PrototypeRegistry
+
+NUMBER = 1_000_000
+
+
+def make_apple() -> Apple:
+    apple = Apple()
+    apple.tags = ["fruit", "red"]  # type: ignore[attr-defined]
+    apple.nutrition = {"kcal": 52, "vitamins": ["C", "B6"]}  # type: ignore[attr-defined]
+    return apple
+
+
+def main() -> None:
+    apple = make_apple()
+    measure("copy.deepcopy", lambda: copy.deepcopy(apple), NUMBER)
+
+    registry = PrototypeRegistry()
+    registry.register("apple", apple)
+    measure("Clone plan", lambda: registry.clone("apple"), NUMBER)
+
+    # Every registered prototype has its own plan
+    orange = Orange()
+    orange.tags = ["fruit", "orange"]  # type: ignore[attr-defined]
+    orange.nutrition = {"kcal": 47, "vitamins": ["C"]}  # type: ignore[attr-defined]
+    registry.register("orange", orange, copy_on_write=True)
+    measure(
+        "Copy-on-write clone plan", lambda: registry.clone("orange"), NUMBER
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+from src.creational.benchmarks import measure
+from src.creational.singleton import (
+    DatabaseInheritedSingleton,
+    DatabaseMetaSingleton,
+)
+
+NUMBER = 1_000_000
+
+
+class Holder:
+    instance = DatabaseMetaSingleton(":memory:")
+
+
+def main() -> None:
+    DatabaseInheritedSingleton(":memory:")
+    cases = {
+        "Plain attribute read": lambda: Holder.instance,
+        "MetaSingleton": lambda: DatabaseMetaSingleton(":memory:"),
+        # Python still calls __init__ every time, the wrapper returns at once
+        "InheritedSingleton": lambda: DatabaseInheritedSingleton(":memory:"),
+    }
+    for name, func in cases.items():
+        measure(name, func, NUMBER)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Compact binary wire format for products, an alternative to Jsonable for bulk transfers.
+
+Layout (little-endian):
+    header:   magic, number of records, number of strings
+    records:  kind, name index, price - a fixed size record per product
+    strings:  offsets of the strings (one more than strings), then UTF-8 data
+
+Every name is stored once in the string table, records refer to it by index. Fixed size records
+allow reading the N-th product straight from a memoryview without decoding the whole buffer.
+"""
+
+import struct
+from collections.abc import Buffer
+from typing import Generator, Iterable, Sequence, overload
+
+from src.creational.products import Apple, Orange, Product
+
+MAGIC = b"PRD1"
+HEADER = struct.Struct("<4sII")
+RECORD = struct.Struct("<BId")
+OFFSET = struct.Struct("<I")
+
+# The kind of a record is the index of its class
+KINDS: list[type[Product]] = [Product, Apple, Orange]
+_KIND_CODES = {cls: code for code, cls in enumerate(KINDS)}
+
+
+def dumps(products: Iterable[Product]) -> bytes:
+    products = list(products)
+    strings: dict[str, int] = {}
+    buffer = bytearray(HEADER.size + RECORD.size * len(products))
+    offset = HEADER.size
+    for product in products:
+        kind = _KIND_CODES.get(type(product))
+        if kind is None:
+            raise ValueError(f"Unknown product type: {type(product)}")
+        index = strings.setdefault(product.name, len(strings))
+        RECORD.pack_into(buffer, offset, kind, index, product.price)
+        offset += RECORD.size
+    HEADER.pack_into(buffer, 0, MAGIC, len(products), len(strings))
+
+    encoded = [string.encode() for string in strings]
+    position = 0
+    for data in encoded:
+        buffer += OFFSET.pack(position)
+        position += len(data)
+    buffer += OFFSET.pack(position)
+    buffer += b"".join(encoded)
+    return bytes(buffer)
+
+
+class ProductBuffer(Sequence[Product]):
+    """Read-only view over an encoded buffer, records are decoded on access."""
+
+    def __init__(self, data: Buffer, cache_names: bool = True) -> None:
+        self.data = memoryview(data)
+        self.cache_names = cache_names
+        magic, length, strings = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ValueError("Not a product buffer")
+        self.length: int = length
+        self._offsets = HEADER.size + RECORD.size * self.length
+        self._strings = self._offsets + OFFSET.size * (strings + 1)
+        # Names are decoded once per string, records share them. Without the cache
+        # a long sequential scan keeps no decoded names, but decodes a repeated name every time.
+        self._names: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return self.length
+
+    def _record(self, index: int) -> tuple[int, int, float]:
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("Product index out of range")
+        return RECORD.unpack_from(self.data, HEADER.size + RECORD.size * index)
+
+    def _name(self, string: int) -> str:
+        name = self._names.get(string)
+        if name is None:
+            offset = self._offsets + OFFSET.size * string
+            start = OFFSET.unpack_from(self.data, offset)[0]
+            end = OFFSET.unpack_from(self.data, offset + OFFSET.size)[0]
+            name = str(
+                self.data[self._strings + start : self._strings + end], "utf-8"
+            )
+            if self.cache_names:
+                self._names[string] = name
+        return name
+
+    def price(self, index: int) -> float:
+        return self._record(index)[2]
+
+    def name(self, index: int) -> str:
+        return self._name(self._record(index)[1])
+
+    @overload
+    def __getitem__(self, index: int) -> Product: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Product]: ...
+
+    def __getitem__(self, index: int | slice) -> Product | list[Product]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.length))]
+        kind, string, price = self._record(index)
+        return KINDS[kind](self._name(string), price)
+
+    def __iter__(self) -> Generator[Product, None, None]:
+        with self.data[HEADER.size : self._offsets] as records:
+            for kind, string, price in RECORD.iter_unpack(records):
+                yield KINDS[kind](self._name(string), price)
+
+    def release(self) -> None:
+        """Release the underlying buffer, e.g. before closing a memory map. Iterators must be closed first."""
+        self.data.release()
+
+
+def loads(data: Buffer, cache_names: bool = True) -> ProductBuffer:
+    return ProductBuffer(data, cache_names)
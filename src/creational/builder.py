@@ -1,18 +1,83 @@
 """
 Builder is a creational design pattern that lets you construct complex objects step by step.
 The pattern allows you to produce different types and representations of an object using the same construction code.
+
+A large catalog does not have to fit in memory: with `chunk_size` the builder sorts products in chunks,
+spills every sorted run to a temporary file and merges the runs lazily when the shelf is iterated.
+Products are pickled one by one, so any product with its extra attributes survives the spill.
 """
 
+import heapq
+import pickle
+import tempfile
+from typing import IO, Generator, Iterable, Iterator
+
 from src.creational.products import Product, ProductShelf
 
 
+def _by_name(product: Product) -> str:
+    return product.name
+
+
 class ProductShelfBuilder:
-    def __init__(self) -> None:
+    def __init__(self, chunk_size: int | None = None) -> None:
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
         self.products: list[Product] = []
+        self.chunk_size = chunk_size
+        self._runs: list[IO[bytes]] = []
 
     def add(self, product: Product) -> None:
         self.products.append(product)
+        if (
+            self.chunk_size is not None
+            and len(self.products) >= self.chunk_size
+        ):
+            self._spill()
+
+    def extend(self, products: Iterable[Product]) -> None:
+        for product in products:
+            self.add(product)
+
+    def _spill(self) -> None:
+        """Write the sorted chunk to a temporary file and start a new one."""
+        self.products.sort(key=_by_name)
+        run = tempfile.TemporaryFile()
+        run.writelines(
+            pickle.dumps(product, pickle.HIGHEST_PROTOCOL)
+            for product in self.products
+        )
+        run.flush()
+        self._runs.append(run)
+        self.products = []
 
     def build(self, category: str) -> ProductShelf:
-        self.products.sort(key=lambda p: p.name)
-        return ProductShelf(category, self.products)
+        if not self._runs:
+            self.products.sort(key=_by_name)
+            return ProductShelf(category, self.products)
+        if self.products:
+            self._spill()
+        runs, self._runs = self._runs, []
+        return ProductShelf(category, _merge(runs))
+
+
+def _read_run(run: IO[bytes]) -> Generator[Product, None, None]:
+    run.seek(0)
+    while True:
+        try:
+            product = pickle.load(run)
+        except EOFError:
+            return
+        yield product
+
+
+def _merge(runs: list[IO[bytes]]) -> Iterator[Product]:
+    """K-way merge of sorted runs, only one product per run is in memory at a time."""
+    iterators = [_read_run(run) for run in runs]
+    try:
+        yield from heapq.merge(*iterators, key=_by_name)
+    finally:
+        for iterator in iterators:
+            iterator.close()
+        for run in runs:
+            run.close()
@@ -0,0 +1,123 @@
+"""
+Columnar representation of a product shelf. Instead of a list of objects it keeps one array per attribute:
+a row stores a 4-byte code of its (class, interned name) label and an 8-byte price in a flat `array('d')`.
+
+When NumPy is installed (it's optional), price operations run on zero-copy NumPy views of the arrays,
+so filter and discount are vectorized, and discount updates the prices in place. Without NumPy,
+aggregations still run in C loops, element-wise operations go through Python floats.
+"""
+
+import importlib
+import math
+import sys
+from array import array
+from itertools import compress
+from typing import Any, Iterable, Iterator, Self
+
+from src.creational.products import Product, ProductShelf
+
+try:
+    np: Any = importlib.import_module("numpy")
+except ImportError:
+    np = None
+
+
+class ColumnarShelf:
+    def __init__(self, category: str) -> None:
+        self.category = category
+        # Dictionary-encoded column: a row stores the index of its (class, interned name) label
+        self.labels: list[tuple[type[Product], str]] = []
+        self.label_codes = array("I")
+        self.prices = array("d")
+        self._label_index: dict[tuple[type[Product], str], int] = {}
+
+    @classmethod
+    def from_products(cls, category: str, products: Iterable[Product]) -> Self:
+        shelf = cls(category)
+        shelf.extend(products)
+        return shelf
+
+    @classmethod
+    def from_shelf(cls, shelf: ProductShelf) -> Self:
+        return cls.from_products(shelf.category, shelf)
+
+    def to_shelf(self) -> ProductShelf:
+        return ProductShelf(self.category, list(self))
+
+    @property
+    def names(self) -> list[str]:
+        return [name for _, name in self.labels]
+
+    def append(self, product: Product) -> None:
+        label = (type(product), product.name)
+        code = self._label_index.get(label)
+        if code is None:
+            code = self._label_index[label] = len(self.labels)
+            self.labels.append((type(product), sys.intern(product.name)))
+        self.label_codes.append(code)
+        self.prices.append(product.price)
+
+    def extend(self, products: Iterable[Product]) -> None:
+        for product in products:
+            self.append(product)
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def __getitem__(self, index: int) -> Product:
+        kind, name = self.labels[self.label_codes[index]]
+        return kind(name, self.prices[index])
+
+    def __iter__(self) -> Iterator[Product]:
+        labels = self.labels
+        for code, price in zip(self.label_codes, self.prices):
+            kind, name = labels[code]
+            yield kind(name, price)
+
+    def _view(self, column: array[Any]) -> Any:
+        """NumPy array sharing memory with the column."""
+        return np.frombuffer(column, dtype=column.typecode)
+
+    def total(self) -> float:
+        if np is not None:
+            return float(self._view(self.prices).sum())
+        return math.fsum(self.prices)
+
+    def min_price(self) -> float:
+        if np is not None:
+            return float(self._view(self.prices).min())
+        return min(self.prices)
+
+    def max_price(self) -> float:
+        if np is not None:
+            return float(self._view(self.prices).max())
+        return max(self.prices)
+
+    def filter(self, low: float, high: float) -> Self:
+        """Products with the price in [low, high], as a new shelf with its own copy of the labels."""
+        shelf = type(self)(self.category)
+        shelf.labels = self.labels.copy()
+        shelf._label_index = self._label_index.copy()
+        if np is not None:
+            prices = self._view(self.prices)
+            mask = (prices >= low) & (prices <= high)
+            shelf.label_codes.frombytes(
+                self._view(self.label_codes)[mask].tobytes()
+            )
+            shelf.prices.frombytes(prices[mask].tobytes())
+            return shelf
+        selected = [low <= price <= high for price in self.prices]
+        shelf.label_codes = array("I", compress(self.label_codes, selected))
+        shelf.prices = array("d", compress(self.prices, selected))
+        return shelf
+
+    def discount(self, rate: float) -> None:
+        """Reduce every price by `rate` (0.1 is 10% off) in place."""
+        if not 0 <= rate <= 1:
+            raise ValueError("rate must be between 0 and 1")
+        factor = 1 - rate
+        if np is not None:
+            view = self._view(self.prices)
+            view *= factor
+            return
+        self.prices[:] = array("d", [price * factor for price in self.prices])
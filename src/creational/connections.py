@@ -1,10 +1,25 @@
+import asyncio
+import itertools
+import time
 from abc import ABC, abstractmethod
-from typing import Mapping, Any, Self
+from dataclasses import dataclass
+from typing import Mapping, Any, Self, Iterable
+
+# How many prepared statements a connection keeps, the oldest one is dropped first
+MAX_STATEMENTS = 256
+
+
+@dataclass(frozen=True)
+class PreparedStatement:
+    query: str
+    handle: int
 
 
 class Connection(ABC):
     is_connected: bool
     query: str | None
+    # Prepared statements cache keyed by query text
+    statements: dict[str, PreparedStatement]
 
     @abstractmethod
     def connect(self) -> None: ...
@@ -15,6 +30,28 @@ class Connection(ABC):
     @abstractmethod
     def execute_query(self, query: str) -> Mapping[str, Any]: ...
 
+    def execute_many(self, queries: Iterable[str]) -> list[Mapping[str, Any]]:
+        """
+        Execute the queries as one batch and return the results in order.
+        Connections that can't send batches fall back to a round trip per query.
+        """
+        return [self.execute_query(query) for query in queries]
+
+    def pipeline(self, batch_size: int = 100) -> "Pipeline":
+        return Pipeline(self, batch_size)
+
+    def prepare(self, query: str) -> PreparedStatement:
+        statement = self.statements.get(query)
+        if statement is None:
+            if len(self.statements) >= MAX_STATEMENTS:
+                del self.statements[next(iter(self.statements))]
+            statement = self._prepare(query)
+            self.statements[query] = statement
+        return statement
+
+    def _prepare(self, query: str) -> PreparedStatement:
+        return PreparedStatement(query, len(self.statements))
+
     def __enter__(self) -> Self:
         """
         RAII (Resource Acquisition Is Initialization) is a programming idiom that states that, using certain software mechanisms,
@@ -27,10 +64,61 @@ class Connection(ABC):
         self.disconnect()
 
 
+class Pipeline:
+    """
+    Pipelining queues queries and sends them in batches of `batch_size`,
+    so N queries cost about N / batch_size round trips instead of N.
+    """
+
+    def __init__(self, connection: Connection, batch_size: int = 100) -> None:
+        self.connection = connection
+        self.batch_size = batch_size
+        self.results: list[Mapping[str, Any]] = []
+        self._pending: list[str] = []
+
+    def execute(self, query: str) -> int:
+        """Queue the query and return the index of its result in `results`."""
+        self._pending.append(query)
+        index = len(self.results) + len(self._pending) - 1
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        return index
+
+    def flush(self) -> list[Mapping[str, Any]]:
+        if self._pending:
+            self.results.extend(self.connection.execute_many(self._pending))
+            self._pending = []
+        return self.results
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        if exc_type is None:
+            self.flush()
+
+
 class MockConnection(Connection):
-    def __init__(self) -> None:
+    """Mock connection that simulates the network `latency` of every round trip to the server."""
+
+    _handles = itertools.count()
+
+    def __init__(self, latency: float = 0, url: str = ":memory:") -> None:
+        self.url = url
         self.is_connected = False
         self.query = None
+        self.statements = {}
+        self.latency = latency
+        self.round_trips = 0
+
+    def _round_trip(self) -> None:
+        self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _prepare(self, query: str) -> PreparedStatement:
+        self._round_trip()
+        return PreparedStatement(query, next(self._handles))
 
     def connect(self) -> None:
         self.is_connected = True
@@ -39,5 +127,58 @@ class MockConnection(Connection):
         self.is_connected = False
 
     def execute_query(self, query: str) -> Mapping[str, Any]:
+        self.prepare(query)
+        self._round_trip()
+        self.query = query
+        return {"key": "value"}
+
+    def execute_many(self, queries: Iterable[str]) -> list[Mapping[str, Any]]:
+        # Statements are prepared once, then the whole batch is sent in a single round trip
+        statements = [self.prepare(query) for query in queries]
+        if not statements:
+            return []
+        self._round_trip()
+        self.query = statements[-1].query
+        return [{"key": "value"} for _ in statements]
+
+
+class AsyncConnection(ABC):
+    is_connected: bool
+    query: str | None
+
+    @abstractmethod
+    async def connect(self) -> None: ...
+
+    @abstractmethod
+    async def disconnect(self) -> None: ...
+
+    @abstractmethod
+    async def execute_query(self, query: str) -> Mapping[str, Any]: ...
+
+    async def __aenter__(self) -> Self:
+        await self.connect()
+        return self
+
+    async def __aexit__(
+        self, exc_type: Any, exc_val: Any, exc_tb: Any
+    ) -> None:
+        await self.disconnect()
+
+
+class AsyncMockConnection(AsyncConnection):
+    def __init__(self) -> None:
+        self.is_connected = False
+        self.query = None
+
+    async def connect(self) -> None:
+        await asyncio.sleep(0)
+        self.is_connected = True
+
+    async def disconnect(self) -> None:
+        await asyncio.sleep(0)
+        self.is_connected = False
+
+    async def execute_query(self, query: str) -> Mapping[str, Any]:
+        await asyncio.sleep(0)
         self.query = query
         return {"key": "value"}
@@ -1,19 +1,113 @@
-from typing import Any
+import functools
+import itertools
+import threading
+from abc import ABC, abstractmethod
+from contextlib import AbstractContextManager, contextmanager
+from typing import Any, Iterator, Mapping, Sequence
 
 from src.creational.connections import Connection, MockConnection
+from src.creational.lazy import lazy
+from src.creational.pool import ConnectionPool
+
+
+class Endpoint:
+    """A database server with its own pool of connections."""
+
+    def __init__(self, url: str, pool_size: int = 5) -> None:
+        self.url = url
+        self.pool_size = pool_size
+        # Requests in flight
+        self.outstanding = 0
+
+    @lazy
+    def pool(self) -> ConnectionPool:
+        return ConnectionPool(
+            functools.partial(MockConnection, url=self.url),
+            self.pool_size,
+            min_size=0,
+        )
+
+
+class Balancer(ABC):
+    @abstractmethod
+    def choose(self, endpoints: Sequence[Endpoint]) -> Endpoint: ...
+
+
+class RoundRobinBalancer(Balancer):
+    def __init__(self) -> None:
+        self._counter = itertools.count()
+
+    def choose(self, endpoints: Sequence[Endpoint]) -> Endpoint:
+        return endpoints[next(self._counter) % len(endpoints)]
+
+
+class LeastOutstandingBalancer(Balancer):
+    def choose(self, endpoints: Sequence[Endpoint]) -> Endpoint:
+        return min(endpoints, key=lambda endpoint: endpoint.outstanding)
 
 
 class Database:
-    _connection: Connection | None = None
+    """
+    Read/write splitting: writes go to the primary, reads are spread over the replicas by the `balancer`,
+    so the read throughput scales with the number of replicas.
+    """
 
-    def __init__(self, db_url: str) -> None:
+    def __init__(
+        self,
+        db_url: str,
+        replica_urls: Sequence[str] = (),
+        *,
+        balancer: Balancer | None = None,
+        pool_size: int = 5,
+    ) -> None:
         self.db_url = db_url
+        self.primary = Endpoint(db_url, pool_size)
+        self.replicas = [Endpoint(url, pool_size) for url in replica_urls]
+        self.balancer = balancer or LeastOutstandingBalancer()
+        self._routing_lock = threading.Lock()
 
-    @property
-    def connection(self) -> Any:
+    @lazy
+    def connection(self) -> Connection:
         """
         Lazy Initialization allows an object to be created only when it is needed.
         """
-        if not self._connection:
-            self._connection = MockConnection()
-        return self._connection
+        return MockConnection(url=self.db_url)
+
+    @contextmanager
+    def _session(
+        self, endpoint: Endpoint | None, timeout: float | None
+    ) -> Iterator[Connection]:
+        with self._routing_lock:
+            if endpoint is None:
+                endpoint = self.balancer.choose(self.replicas)
+            endpoint.outstanding += 1
+        try:
+            with endpoint.pool.acquire(timeout) as connection:
+                yield connection
+        finally:
+            with self._routing_lock:
+                endpoint.outstanding -= 1
+
+    def reader(
+        self, timeout: float | None = None
+    ) -> AbstractContextManager[Connection]:
+        """Borrow a connection to a replica, or to the primary if there are no replicas."""
+        return self._session(None if self.replicas else self.primary, timeout)
+
+    def writer(
+        self, timeout: float | None = None
+    ) -> AbstractContextManager[Connection]:
+        """Borrow a connection to the primary."""
+        return self._session(self.primary, timeout)
+
+    def read(self, query: str) -> Mapping[str, Any]:
+        with self.reader() as connection:
+            return connection.execute_query(query)
+
+    def write(self, query: str) -> Mapping[str, Any]:
+        with self.writer() as connection:
+            return connection.execute_query(query)
+
+    def dispose(self) -> None:
+        for endpoint in (self.primary, *self.replicas):
+            endpoint.pool.dispose()
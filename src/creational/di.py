@@ -11,48 +11,350 @@ DI Container is a class that creates a single place that is responsible for crea
 of an object.
 """
 
+import asyncio
+import functools
 import inspect
-from typing import Callable, MutableMapping, Any
+import threading
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import Callable, MutableMapping, Any, cast
+
+
+class Lifetime(StrEnum):
+    # A new instance on every resolution
+    TRANSIENT = "transient"
+    # One instance per scope, see Container.scope()
+    SCOPED = "scoped"
+    # One instance per container
+    SINGLETON = "singleton"
+
+
+@dataclass
+class Provider:
+    implementation: Callable[..., Any]
+    lifetime: Lifetime
+    # Constructor parameters to inject, filled in by Container.compile()
+    dependencies: dict[str, type[Any]] = field(default_factory=dict)
+    # The implementation or one of its dependencies is an async factory
+    is_async: bool = False
+    # A scoped dependency every resolution captures, directly or through transient dependencies
+    captured_scope: type[Any] | None = None
+
+
+# A compiled factory takes the instances of the current scope (None outside of a scope)
+type Factory = Callable[[dict[type[Any], Any] | None], Any]
+
+
+class Scope:
+    def __init__(self, container: "Container") -> None:
+        self.container = container
+        self.instances: dict[type[Any], Any] = {}
+        # Async constructions in flight
+        self.pending: dict[type[Any], asyncio.Future[Any]] = {}
+
+    def resolve[T](self, interface: type[T]) -> T:
+        return self.container._resolve(interface, self.instances)
+
+    async def aresolve[T](self, interface: type[T]) -> T:
+        return await self.container._aresolve(interface, self)
+
+    def __enter__(self) -> "Scope":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.instances.clear()
 
 
 class Container:
     def __init__(self) -> None:
-        self._providers: MutableMapping[type[Any], Callable[[], Any]] = {}
+        self._providers: MutableMapping[type[Any], Provider] = {}
+        self._factories: dict[type[Any], Factory] | None = None
+        self._singletons: dict[type[Any], Any] = {}
+        # Async singletons in flight
+        self._pending: dict[type[Any], asyncio.Future[Any]] = {}
+        self._lock = threading.RLock()
 
     def register(
         self,
         interface: type[Any],
-        implementation: type[Any] | None = None,
+        implementation: Callable[..., Any] | None = None,
+        lifetime: Lifetime = Lifetime.TRANSIENT,
     ) -> None:
+        """The implementation is a class or a factory function, it may be `async def`."""
         impl = implementation if implementation is not None else interface
+        self._providers[interface] = Provider(impl, lifetime)
+        # The graph has changed, it will be compiled again
+        self._factories = None
+
+    def compile(self) -> None:
+        """
+        Walk the dependency graph once: check that there are no cycles and missing providers,
+        and turn every provider into a flat function that calls the constructors directly.
+        Transient dependencies are inlined, so resolving a deep graph takes a single Python call.
+        """
+        order: list[type[Any]] = []
+        visited: set[type[Any]] = set()
+        for interface in self._providers:
+            self._visit(interface, [], visited, order)
+
+        namespace: dict[str, Any] = {}
+        expressions: dict[type[Any], str] = {}
+        factories: dict[type[Any], Factory] = {}
+        for i, interface in enumerate(order):
+            provider = self._providers[interface]
+            namespace[f"impl{i}"] = provider.implementation
+            args = ", ".join(
+                f"{name}={expressions[dependency]}"
+                for name, dependency in provider.dependencies.items()
+            )
+            call = f"impl{i}({args})"
+            exec(f"def factory{i}(scope):\n    return {call}", namespace)
+            factory = namespace[f"factory{i}"]
+            if provider.is_async:
+                factory = self._async_only(interface)
+            match provider.lifetime:
+                case Lifetime.TRANSIENT:
+                    expressions[interface] = call
+                case Lifetime.SCOPED:
+                    factory = self._scoped(interface, factory)
+                    expressions[interface] = f"get{i}(scope)"
+                case Lifetime.SINGLETON:
+                    factory = self._singleton(interface, factory)
+                    expressions[interface] = f"get{i}(scope)"
+            namespace[f"get{i}"] = factory
+            factories[interface] = factory
+        self._factories = factories
+
+    def _visit(
+        self,
+        interface: type[Any],
+        path: list[type[Any]],
+        visited: set[type[Any]],
+        order: list[type[Any]],
+    ) -> None:
+        """Depth-first search that puts dependencies before their dependents."""
+        if interface in visited:
+            return
+        if interface in path:
+            cycle = " -> ".join(t.__name__ for t in [*path, interface])
+            raise ValueError(f"Circular dependency: {cycle}")
+        provider = self._providers[interface]
+        provider.dependencies = self._dependencies(provider)
+        provider.captured_scope = None
+        for dependency in provider.dependencies.values():
+            self._visit(dependency, [*path, interface], visited, order)
+            scoped = self._providers[dependency].captured_scope
+            if scoped is None:
+                continue
+            if provider.lifetime == Lifetime.SINGLETON:
+                raise ValueError(
+                    f"Singleton {interface} depends on scoped {scoped}"
+                )
+            if provider.lifetime == Lifetime.TRANSIENT:
+                provider.captured_scope = scoped
+        if provider.lifetime == Lifetime.SCOPED:
+            provider.captured_scope = interface
+        provider.is_async = inspect.iscoroutinefunction(
+            provider.implementation
+        ) or any(
+            self._providers[dependency].is_async
+            for dependency in provider.dependencies.values()
+        )
+        visited.add(interface)
+        order.append(interface)
+
+    def _dependencies(self, provider: Provider) -> dict[str, type[Any]]:
+        dependencies = {}
+        parameters = inspect.signature(
+            provider.implementation, eval_str=True
+        ).parameters
+        for name, param in parameters.items():
+            if param.annotation in self._providers:
+                dependencies[name] = param.annotation
+            elif param.default is param.empty and param.kind not in (
+                param.VAR_POSITIONAL,
+                param.VAR_KEYWORD,
+            ):
+                raise ValueError(
+                    f"No provider registered for {param.annotation}, "
+                    f"required by {provider.implementation}"
+                )
+        return dependencies
 
-        def factory() -> Any:
-            parameters = inspect.signature(impl).parameters
-            args = {
-                name: self.resolve(param.annotation)
-                for name, param in parameters.items()
-                if param.annotation in self._providers
-            }
-            return impl(**args)
+    def _singleton(self, interface: type[Any], factory: Factory) -> Factory:
+        singletons = self._singletons
 
-        self._providers[interface] = factory
+        def get(scope: dict[type[Any], Any] | None) -> Any:
+            try:
+                return singletons[interface]
+            except KeyError:
+                with self._lock:
+                    if interface not in singletons:
+                        singletons[interface] = factory(scope)
+                    return singletons[interface]
+
+        return get
+
+    @staticmethod
+    def _scoped(interface: type[Any], factory: Factory) -> Factory:
+        def get(scope: dict[type[Any], Any] | None) -> Any:
+            if scope is None:
+                raise ValueError(
+                    f"{interface} is scoped, resolve it within a scope"
+                )
+            try:
+                return scope[interface]
+            except KeyError:
+                instance = scope[interface] = factory(scope)
+                return instance
+
+        return get
+
+    @staticmethod
+    def _async_only(interface: type[Any]) -> Factory:
+        def get(scope: dict[type[Any], Any] | None) -> Any:
+            raise ValueError(
+                f"{interface} has async dependencies, use aresolve()"
+            )
+
+        return get
+
+    def scope(self) -> Scope:
+        return Scope(self)
 
     def resolve[T](self, interface: type[T]) -> T:
-        if interface in self._providers:
-            return self._providers[interface]()  # type: ignore[no-any-return]
-        raise ValueError(f"No provider registered for {interface}")
+        return self._resolve(interface, None)
+
+    def _resolve[T](
+        self, interface: type[T], scope: dict[type[Any], Any] | None
+    ) -> T:
+        factories = self._factories
+        if factories is None:
+            self.compile()
+            factories = self._factories
+            assert factories is not None
+        factory = factories.get(interface)
+        if factory is None:
+            raise ValueError(f"No provider registered for {interface}")
+        return factory(scope)  # type: ignore[no-any-return]
+
+    async def aresolve[T](self, interface: type[T]) -> T:
+        """
+        Resolve a graph with async factories. Independent dependencies are constructed concurrently,
+        so the resolution takes about the time of the longest chain in the graph.
+        """
+        return await self._aresolve(interface, None)
+
+    async def _aresolve[T](self, interface: type[T], scope: Scope | None) -> T:
+        if self._factories is None:
+            self.compile()
+        provider = self._providers.get(interface)
+        if provider is None:
+            raise ValueError(f"No provider registered for {interface}")
+        if not provider.is_async:
+            instances = None if scope is None else scope.instances
+            return self._resolve(interface, instances)
+        match provider.lifetime:
+            case Lifetime.TRANSIENT:
+                return await self._construct(provider, scope)  # type: ignore[no-any-return]
+            case Lifetime.SCOPED:
+                if scope is None:
+                    raise ValueError(
+                        f"{interface} is scoped, resolve it within a scope"
+                    )
+                instances, pending = scope.instances, scope.pending
+            case Lifetime.SINGLETON:
+                instances, pending = self._singletons, self._pending
+        if interface in instances:
+            return instances[interface]  # type: ignore[no-any-return]
+        # Concurrent first resolutions share one construction
+        future = pending.get(interface)
+        if future is None:
+            future = asyncio.ensure_future(self._construct(provider, scope))
+            pending[interface] = future
+            future.add_done_callback(
+                lambda done: self._settle(interface, done, instances, pending)
+            )
+        # A cancelled caller must not cancel the construction shared with others
+        return await asyncio.shield(future)
+
+    async def _construct(self, provider: Provider, scope: Scope | None) -> Any:
+        names = list(provider.dependencies)
+        values = await asyncio.gather(
+            *(
+                self._aresolve(dependency, scope)
+                for dependency in provider.dependencies.values()
+            )
+        )
+        instance = provider.implementation(**dict(zip(names, values)))
+        if inspect.isawaitable(instance):
+            instance = await instance
+        return instance
+
+    @staticmethod
+    def _settle(
+        interface: type[Any],
+        future: asyncio.Future[Any],
+        instances: dict[type[Any], Any],
+        pending: dict[type[Any], asyncio.Future[Any]],
+    ) -> None:
+        pending.pop(interface, None)
+        if not future.cancelled() and future.exception() is None:
+            instances.setdefault(interface, future.result())
 
     def inject[ReturnT](
         self, func: Callable[..., ReturnT]
     ) -> Callable[..., ReturnT]:
+        """
+        The annotations are read once, when the function is decorated. The parameters to inject
+        are planned on the first call and planned again only after a new interface is registered,
+        so a call usually just resolves the planned providers.
+        """
+        parameters = inspect.signature(func, eval_str=True).parameters
+        annotated = tuple(
+            (name, param.annotation)
+            for name, param in parameters.items()
+            if param.annotation is not inspect.Parameter.empty
+        )
+        if not annotated:
+            return func
+        providers = self._providers
+        # Providers are never removed, so their number tells whether the plan is stale
+        planned_for = -1
+        plan: tuple[tuple[str, type[Any]], ...] = ()
+
+        def current_plan() -> tuple[tuple[str, type[Any]], ...]:
+            nonlocal planned_for, plan
+            size = len(providers)
+            if planned_for != size:
+                # Publish the plan before its size, so other threads never pair a new size with an old plan
+                plan = tuple(
+                    (name, annotation)
+                    for name, annotation in annotated
+                    if annotation in providers
+                )
+                planned_for = size
+            return plan
+
+        resolve = self._resolve
+        aresolve = self._aresolve
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                for name, interface in current_plan():
+                    if name not in kwargs:
+                        kwargs[name] = await aresolve(interface, None)
+                return await func(*args, **kwargs)
+
+            return cast(Callable[..., ReturnT], async_wrapper)
+
+        @functools.wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> ReturnT:
-            annotations = inspect.getfullargspec(func).annotations
-            annotations.pop("return", None)
-            resolved_args = {
-                name: self.resolve(param_type)
-                for name, param_type in annotations.items()
-                if param_type in self._providers and name not in kwargs
-            }
-            return func(*args, **resolved_args, **kwargs)
+            for name, interface in current_plan():
+                if name not in kwargs:
+                    kwargs[name] = resolve(interface, None)
+            return func(*args, **kwargs)
 
         return wrapper
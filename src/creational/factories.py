@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Callable
 
 from src.creational.products import (
     Apple,
@@ -8,6 +9,7 @@ from src.creational.products import (
     AppleAdviser,
     OrangeAdviser,
 )
+from src.creational.prototype import ClonePlan
 
 
 class ProductSimpleFactory:
@@ -32,19 +34,80 @@ class ProductSimpleFactory:
         return product
 
 
+class ProductRegistryFactory:
+    """
+    The same Simple Factory driven by a registry: new products are plugged in with `register`
+    instead of editing a hardcoded match.
+
+    `make_many` clones a template prototype, which is built once per name, instead of running
+    the constructor n times. With `max_free` released products are kept in a free list and handed out
+    again by `make` and `make_many`. A recycled product gets the fields of the template back,
+    so recycle only products whose fields are immutable, like Apple and Orange.
+    """
+
+    def __init__(self, max_free: int = 0) -> None:
+        self.constructors: dict[str, Callable[[], Product]] = {}
+        self.max_free = max_free
+        self._plans: dict[str, tuple[Product, ClonePlan]] = {}
+        self._free: dict[str, list[Product]] = {}
+
+    def register(self, name: str, constructor: Callable[[], Product]) -> None:
+        self.constructors[name] = constructor
+        self._plans.pop(name, None)
+        self._free[name] = []
+
+    def _constructor(self, name: str) -> Callable[[], Product]:
+        constructor = self.constructors.get(name)
+        if constructor is None:
+            raise ValueError(f"Unknown product: {name}")
+        return constructor
+
+    def _template(self, name: str) -> tuple[Product, ClonePlan]:
+        template = self._plans.get(name)
+        if template is None:
+            prototype = self._constructor(name)()
+            template = self._plans[name] = (prototype, ClonePlan(prototype))
+        return template
+
+    def make(self, name: str) -> Product:
+        free = self._free.get(name)
+        if free:
+            product = free.pop()
+            vars(product).update(vars(self._plans[name][0]))
+            return product
+        return self._constructor(name)()
+
+    def make_many(self, name: str, n: int) -> list[Product]:
+        prototype, plan = self._template(name)
+        products: list[Product] = []
+        free = self._free[name]
+        while free and len(products) < n:
+            product = free.pop()
+            vars(product).update(vars(prototype))
+            products.append(product)
+        clone = plan.clone
+        products.extend([clone(prototype) for _ in range(n - len(products))])
+        return products
+
+    def release(self, name: str, product: Product) -> None:
+        """Return a product that is no longer used, it is dropped when the free list is full."""
+        free = self._free.get(name)
+        if free is None:
+            raise ValueError(f"Unknown product: {name}")
+        if len(free) < self.max_free:
+            if name not in self._plans:
+                self._template(name)
+            free.append(product)
+
+
+product_factory = ProductRegistryFactory()
+product_factory.register("apple", Apple)
+product_factory.register("orange", Orange)
+
+
 def simple_factory_make_product(name: str) -> Product:
     """Or you can have a function that does the same thing:"""
-    product: Product
-    match name:
-        case "apple":
-            product = Apple()
-            # ... do some more stuff
-        case "orange":
-            product = Orange()
-            # ... do some more stuff
-        case _:
-            raise ValueError(f"Unknown product: {name}")
-    return product
+    return product_factory.make(name)
 
 
 class ProductFactoryMethod(ABC):
@@ -3,21 +3,143 @@ Creational Method is a creational design pattern that is simple wrapper method o
 The create method helps isolate any changes to the product construction from the main code.
 """
 
+import inspect
 import json
+import math
 from abc import ABC
-from typing import Self
+from json.encoder import encode_basestring_ascii
+from typing import Any, Callable, Iterable, Iterator, Self, TextIO
+
+
+# Annotations are not enforced, so the encoders take a fast path only for a value of the exact type
+# and pass anything else (an int in a float field, a bool in an int field) to json.dumps
+
+
+def _encode_str(value: str) -> str:
+    if type(value) is str:
+        return encode_basestring_ascii(value)
+    return json.dumps(value)
+
+
+def _encode_int(value: int) -> str:
+    if type(value) is int:
+        return int.__repr__(value)
+    return json.dumps(value)
+
+
+def _encode_float(value: float) -> str:
+    if type(value) is float and math.isfinite(value):
+        return float.__repr__(value)
+    return json.dumps(value)
+
+
+def _encode_bool(value: bool) -> str:
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    return json.dumps(value)
+
+
+# Encoders of the values by their annotation, anything else goes through json.dumps
+ENCODERS: dict[Any, Callable[[Any], str]] = {
+    str: _encode_str,
+    int: _encode_int,
+    float: _encode_float,
+    bool: _encode_bool,
+}
+
+
+class Codec:
+    """
+    JSON encoder and decoder of a class, built once from its __init__ signature.
+    The encoder formats the JSON string straight from the attributes, without an intermediate dict.
+    """
+
+    def __init__(self, cls: type[Any]) -> None:
+        self.cls = cls
+        parameters = [
+            param
+            for param in inspect.signature(
+                cls, eval_str=True
+            ).parameters.values()
+            if param.kind in (param.POSITIONAL_OR_KEYWORD, param.KEYWORD_ONLY)
+        ]
+        self.fields = [param.name for param in parameters]
+        self.required = {
+            param.name for param in parameters if param.default is param.empty
+        }
+        namespace: dict[str, Any] = {}
+        parts = []
+        for i, param in enumerate(parameters):
+            namespace[f"encode{i}"] = ENCODERS.get(
+                param.annotation, json.dumps
+            )
+            key = json.dumps(param.name).replace("{", "{{").replace("}", "}}")
+            parts.append(f"{key}: {{encode{i}(obj.{param.name})}}")
+        body = ", ".join(parts)
+        exec(f"def encode(obj):\n    return f'{{{{{body}}}}}'", namespace)
+        self.encode: Callable[[Any], str] = namespace["encode"]
+
+    def decode(self, dct: Any) -> Any:
+        if not isinstance(dct, dict):
+            raise ValueError("JSON must represent an object")
+        missing = self.required - dct.keys()
+        if missing:
+            raise ValueError(f"Missing fields: {', '.join(sorted(missing))}")
+        return self.cls(
+            **{name: dct[name] for name in self.fields if name in dct}
+        )
+
+
+_codecs: dict[type[Any], Codec] = {}
+
+
+def codec(cls: type[Any]) -> Codec:
+    try:
+        return _codecs[cls]
+    except KeyError:
+        _codecs[cls] = result = Codec(cls)
+        return result
+
+
+def _loads(data: str) -> Any:
+    try:
+        return json.loads(data)
+    except json.JSONDecodeError:
+        raise ValueError("Data must be a valid JSON string")
 
 
 class Jsonable(ABC):
     def json(self) -> str:
-        return json.dumps(self)
+        return codec(type(self)).encode(self)
 
     @classmethod
     def from_json(cls, data: str) -> Self:
-        try:
-            dct = json.loads(data)
-        except json.JSONDecodeError:
-            raise ValueError("Data must be a valid JSON string")
-        if not isinstance(dct, dict):
-            raise ValueError("JSON must represent an object")
-        return cls(**dct)  # noqa
+        return codec(cls).decode(_loads(data))  # type: ignore[no-any-return]
+
+    @staticmethod
+    def dumps_many(objects: Iterable["Jsonable"]) -> str:
+        return (
+            f"[{', '.join(codec(type(obj)).encode(obj) for obj in objects)}]"
+        )
+
+    @classmethod
+    def loads_many(cls, data: str) -> list[Self]:
+        dcts = _loads(data)
+        if not isinstance(dcts, list):
+            raise ValueError("JSON must represent an array")
+        decode = codec(cls).decode
+        return [decode(dct) for dct in dcts]
+
+    @staticmethod
+    def dump_ndjson(objects: Iterable["Jsonable"], fp: TextIO) -> None:
+        """Stream objects to a file, one JSON object per line."""
+        fp.writelines(f"{codec(type(obj)).encode(obj)}\n" for obj in objects)
+
+    @classmethod
+    def load_ndjson(cls, fp: TextIO) -> Iterator[Self]:
+        decode = codec(cls).decode
+        for line in fp:
+            if line.strip():
+                yield decode(_loads(line))
@@ -0,0 +1,105 @@
+"""
+Lazy Initialization allows an object to be created only when it is needed.
+
+The `lazy` descriptor computes the value on first access and stores it in the instance `__dict__`
+under the same name. It is a non-data descriptor, so every later access finds the value in `__dict__`
+and doesn't call the descriptor at all: the fast path after initialization takes no locks.
+The first access is guarded by double-checked locking with a lock of the instance, so concurrent threads
+compute the value once, and the first access on one instance doesn't block other instances.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Self, overload
+
+
+class lazy[T]:
+    def __init__(self, func: Callable[[Any], T]) -> None:
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner: type[Any], name: str) -> None:
+        self.name = name
+
+    @property
+    def lock_name(self) -> str:
+        # Not an identifier, so it can't clash with attributes
+        return f"{self.name}.lock"
+
+    @overload
+    def __get__(self, instance: None, owner: type[Any]) -> Self: ...
+
+    @overload
+    def __get__(self, instance: object, owner: type[Any]) -> T: ...
+
+    def __get__(self, instance: object | None, owner: type[Any]) -> Self | T:
+        if instance is None:
+            return self
+        # setdefault is atomic, so all threads get the same lock
+        lock = instance.__dict__.setdefault(self.lock_name, threading.RLock())
+        with lock:
+            # Another thread could initialize the value while we were waiting for the lock
+            try:
+                return instance.__dict__[self.name]  # type: ignore[no-any-return]
+            except KeyError:
+                value = self.func(instance)
+                instance.__dict__[self.name] = value
+        # Later accesses find the value and don't need the lock
+        instance.__dict__.pop(self.lock_name, None)
+        return value
+
+    def reset(self, instance: object) -> None:
+        """Drop the value, the next access will compute it again."""
+        instance.__dict__.pop(self.name, None)
+
+
+class async_lazy[T]:
+    """
+    Lazy initialization for coroutines: `await obj.attr`.
+
+    The first access starts a task and caches it, concurrent awaiters share this task,
+    later ones get the finished task. A failed initialization is dropped, so the next access retries it.
+    """
+
+    def __init__(self, func: Callable[[Any], Awaitable[T]]) -> None:
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner: type[Any], name: str) -> None:
+        self.name = name
+
+    @overload
+    def __get__(self, instance: None, owner: type[Any]) -> Self: ...
+
+    @overload
+    def __get__(
+        self, instance: object, owner: type[Any]
+    ) -> asyncio.Future[T]: ...
+
+    def __get__(
+        self, instance: object | None, owner: type[Any]
+    ) -> Self | asyncio.Future[T]:
+        if instance is None:
+            return self
+        # There is no await between the check and the assignment, so the event loop can't interleave them
+        future: asyncio.Future[T] | None = instance.__dict__.get(self.name)
+        if future is None:
+            future = asyncio.ensure_future(self.func(instance))
+            future.add_done_callback(
+                lambda done: self._forget_failed(instance, done)
+            )
+            instance.__dict__[self.name] = future
+        return future
+
+    def _forget_failed(
+        self, instance: object, future: asyncio.Future[T]
+    ) -> None:
+        if future.cancelled() or future.exception() is not None:
+            if instance.__dict__.get(self.name) is future:
+                self.reset(instance)
+
+    def reset(self, instance: object) -> None:
+        """Drop the value, the next access will compute it again."""
+        instance.__dict__.pop(self.name, None)
@@ -6,7 +6,11 @@ state and behavior rather than the shared identity. He proposed using the Monost
 multiple instances, but they share the same state (data).
 """
 
-from typing import Any
+import multiprocessing
+import struct
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing.synchronize import Lock
+from typing import Any, ClassVar, Self, cast, overload
 
 from src.creational.db import Database
 
@@ -24,3 +28,141 @@ class Monostate(type):
 
 class DatabaseMonostate(Database, metaclass=Monostate):
     pass
+
+
+class SharedState:
+    """A shared memory block and the lock guarding it."""
+
+    def __init__(self, memory: SharedMemory, lock: Lock) -> None:
+        self.memory = memory
+        self.lock = lock
+
+    @property
+    def buffer(self) -> memoryview:
+        if self.memory.buf is None:
+            raise RuntimeError("Shared memory is closed")
+        return self.memory.buf
+
+
+class SharedField[T]:
+    """
+    A field stored in the shared memory block of its class at a fixed offset.
+    Supported kinds: int, float, bool, and str or bytes with a maximum size in bytes.
+    """
+
+    _formats: ClassVar[dict[type[Any], str]] = {
+        int: "q",
+        float: "d",
+        bool: "?",
+    }
+
+    def __init__(self, kind: type[T], size: int = 0) -> None:
+        self.kind = kind
+        if kind in (str, bytes):
+            if size <= 0:
+                raise ValueError("str and bytes fields need a size")
+            # The length of the value, then the value itself
+            self.struct = struct.Struct(f"=I{size}s")
+        else:
+            self.struct = struct.Struct(f"={self._formats[kind]}")
+        self.name = ""
+
+    def __set_name__(self, owner: type[Any], name: str) -> None:
+        self.name = name
+
+    @overload
+    def __get__(self, instance: None, owner: type[Any]) -> Self: ...
+
+    @overload
+    def __get__(self, instance: object, owner: type[Any]) -> T: ...
+
+    def __get__(self, instance: object | None, owner: type[Any]) -> Self | T:
+        if instance is None:
+            return self
+        state, offset = self._locate(owner)
+        with state.lock:
+            values = self.struct.unpack_from(state.buffer, offset)
+        if self.kind is str:
+            length, data = values
+            return cast(T, data[:length].decode())
+        if self.kind is bytes:
+            length, data = values
+            return cast(T, data[:length])
+        return cast(T, values[0])
+
+    def __set__(self, instance: object, value: T) -> None:
+        state, offset = self._locate(type(instance))
+        if isinstance(value, str):
+            value = cast(T, value.encode())
+        if isinstance(value, bytes):
+            if len(value) > self.struct.size - 4:
+                raise ValueError(f"{self.name} doesn't fit into its field")
+            values: tuple[Any, ...] = (len(value), value)
+        else:
+            values = (value,)
+        with state.lock:
+            self.struct.pack_into(state.buffer, offset, *values)
+
+    def _locate(self, owner: type[Any]) -> tuple[SharedState, int]:
+        """The shared state of the class and the offset of the field in its block."""
+        state: SharedState | None = owner.__dict__.get("_shared_state")
+        if state is None:
+            raise RuntimeError(
+                f"Shared state of {owner.__name__} isn't created, call create()"
+            )
+        return state, owner._shared_offsets[self.name]
+
+
+class SharedMonostate:
+    """
+    Monostate that shares its fields across processes. The fields declared as SharedField live
+    in a multiprocessing.shared_memory block, so a read is a struct unpack from the block under a lock,
+    without a round trip to a manager process. Other attributes stay local to the process.
+
+    Call create() in the parent process before forking workers. A spawned worker gets the state
+    as an argument and calls attach().
+    """
+
+    _shared_state: ClassVar[SharedState | None] = None
+    _shared_size: ClassVar[int] = 0
+    # Offsets of the fields in the block, every class has its own layout
+    _shared_offsets: ClassVar[dict[str, int]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        fields: dict[str, SharedField[Any]] = {}
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if isinstance(value, SharedField):
+                    fields[name] = value
+        offset = 0
+        cls._shared_offsets = {}
+        for name, field in fields.items():
+            cls._shared_offsets[name] = offset
+            offset += field.struct.size
+        cls._shared_size = offset
+        # Every class has its own block, a subclass must not read or unlink the block of its base
+        cls._shared_state = None
+
+    @classmethod
+    def create(cls) -> SharedState:
+        memory = SharedMemory(create=True, size=max(cls._shared_size, 1))
+        cls._shared_state = SharedState(memory, multiprocessing.Lock())
+        return cls._shared_state
+
+    @classmethod
+    def attach(cls, state: SharedState) -> None:
+        cls._shared_state = state
+
+    @classmethod
+    def unlink(cls) -> None:
+        """Release the block, call it once in the process that created it."""
+        if cls._shared_state is not None:
+            cls._shared_state.memory.close()
+            cls._shared_state.memory.unlink()
+            cls._shared_state = None
+
+
+class DatabaseSharedMonostate(Database, SharedMonostate):
+    # Reads and writes str like Database.db_url, mypy doesn't match a descriptor to a base attribute
+    db_url: SharedField[str] = SharedField(str, 256)  # type: ignore[assignment, unused-ignore]
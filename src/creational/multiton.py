@@ -1,27 +1,147 @@
 """
 Multiton is a variation of the Singleton pattern where we can store multiple instances based on certain criteria.
-In our case, we can use a dictionary with a key consisting of the class name and class arguments to resolve the issue
+In our case, we can use a dictionary with a key consisting of the class arguments to resolve the issue
 encountered in the previous section effectively.
+
+Every multiton class has its own registry. By default, it keeps instances forever. A long-running process
+with an unbounded set of keys should pick a bounded registry with class keywords:
+
+    class Tenant(metaclass=Multiton, weak=True): ...  # drop instances nobody references
+    class Tenant(metaclass=Multiton, maxsize=128, on_evict=close): ...  # keep the 128 most recently used
+
+The key is built from the arguments, lists, dicts and sets among them are converted to hashable equivalents.
+Other unhashable arguments raise TypeError.
 """
 
-from typing import Any
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, MutableMapping
 
 from src.creational.db import Database
 
+# Separates positional and keyword arguments in a key, so f(1, a=2) and f(1, ("a", 2)) differ
+_KWARGS_MARK = object()
+
+
+def _freeze(name: str, value: Any) -> Hashable:
+    """Turn lists, tuples, dicts and sets into hashable values, keeping their type apart."""
+    match value:
+        case list() | tuple():
+            return type(value), tuple(_freeze(name, item) for item in value)
+        case dict():
+            return type(value), frozenset(
+                (_freeze(name, key), _freeze(name, item))
+                for key, item in value.items()
+            )
+        case set() | frozenset():
+            return type(value), frozenset(
+                _freeze(name, item) for item in value
+            )
+    try:
+        hash(value)
+    except TypeError:
+        raise TypeError(
+            f"Argument {name} of type {type(value).__name__} "
+            "can't be a part of a multiton key"
+        ) from None
+    return value  # type: ignore[no-any-return]
+
 
 class Multiton(type):
-    _instances: dict[str, Any] = {}
+    _instances: MutableMapping[Hashable, Any]
+    _maxsize: int | None
+    _on_evict: Callable[[Any], None] | None
+    _lock: threading.RLock
+
+    def __new__(
+        mcs,
+        name: str,
+        bases: tuple[type, ...],
+        ns: dict[str, Any],
+        **kwargs: Any,
+    ) -> "Multiton":
+        return super().__new__(mcs, name, bases, ns)
+
+    def __init__(
+        cls,
+        name: str,
+        bases: tuple[type, ...],
+        ns: dict[str, Any],
+        *,
+        weak: bool = False,
+        maxsize: int | None = None,
+        on_evict: Callable[[Any], None] | None = None,
+    ) -> None:
+        super().__init__(name, bases, ns)
+        if maxsize is None and on_evict is not None:
+            raise ValueError("on_evict requires maxsize")
+        if weak and maxsize is not None:
+            raise ValueError("Choose either weak or maxsize")
+        if weak:
+            cls._instances = weakref.WeakValueDictionary()
+        elif maxsize is not None:
+            cls._instances = OrderedDict()
+        else:
+            cls._instances = {}
+        cls._maxsize = maxsize
+        cls._on_evict = on_evict
+        cls._lock = threading.RLock()
 
-    @classmethod
-    def _generate_instance_key(cls, args: Any, kwargs: Any) -> str:
-        return f"{cls}:{args}:{sorted(kwargs)}"
+    @staticmethod
+    def _generate_instance_key(
+        args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> Hashable:
+        key = (
+            (*args, _KWARGS_MARK, *sorted(kwargs.items())) if kwargs else args
+        )
+        try:
+            hash(key)
+        except TypeError:
+            # Slow path for lists, dicts and sets among the arguments
+            return Multiton._freeze_key(args, kwargs)
+        return key
+
+    @staticmethod
+    def _freeze_key(args: tuple[Any, ...], kwargs: dict[str, Any]) -> Hashable:
+        key: list[Any] = [_freeze(f"#{i}", arg) for i, arg in enumerate(args)]
+        if kwargs:
+            key.append(_KWARGS_MARK)
+            key += [
+                (name, _freeze(name, value))
+                for name, value in sorted(kwargs.items())
+            ]
+        return tuple(key)
 
     def __call__(cls, *args: Any, **kwargs: Any) -> Any:
         key = cls._generate_instance_key(args, kwargs)
-        if key not in cls._instances:
-            instance = super().__call__(*args, **kwargs)
-            cls._instances[key] = instance
-        return cls._instances[key]
+        if cls._maxsize is None:
+            # Lock-free fast path, a single lookup is atomic
+            instance = cls._instances.get(key)
+            if instance is not None:
+                return instance
+        with cls._lock:
+            # Another thread could create the instance while we were waiting for the lock
+            instance = cls._instances.get(key)
+            if instance is None:
+                instance = super().__call__(*args, **kwargs)
+                cls._instances[key] = instance
+                evicted = cls._evict()
+            else:
+                evicted = None
+                if isinstance(cls._instances, OrderedDict):
+                    cls._instances.move_to_end(key)
+        if evicted is not None and cls._on_evict is not None:
+            cls._on_evict(evicted)
+        return instance
+
+    def _evict(cls) -> Any:
+        if not isinstance(cls._instances, OrderedDict):
+            return None
+        if cls._maxsize is None or len(cls._instances) <= cls._maxsize:
+            return None
+        _, evicted = cls._instances.popitem(last=False)
+        return evicted
 
 
 class DatabaseMultiton(Database, metaclass=Multiton):
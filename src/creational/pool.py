@@ -10,11 +10,18 @@ The performance improvement is especially noticeable when objects are frequently
 but only a small number of them exist at a time.
 """
 
-import queue
+import contextlib
+import logging
+import threading
+import time
 from abc import abstractmethod, ABC
-from typing import Self, Any
+from collections import deque
+from typing import Self, Any, Iterator, Callable
 
 from src.creational.connections import Connection
+from src.creational.pool_stats import PoolMonitor, PoolStats
+
+logger = logging.getLogger(__name__)
 
 
 class EmptyPoolError(Exception):
@@ -23,7 +30,11 @@ class EmptyPoolError(Exception):
 
 class Pool(ABC):
     @abstractmethod
-    def connect(self) -> Connection: ...
+    def connect(self, timeout: float | None = 0) -> Connection:
+        """
+        Take a connection from the pool. If the pool is drained, wait up to `timeout` seconds
+        (0 - fail at once, None - wait forever) and raise EmptyPoolError after that.
+        """
 
     @abstractmethod
     def disconnect(self, connection: Connection) -> None: ...
@@ -34,37 +45,294 @@ class Pool(ABC):
     @abstractmethod
     def empty(self) -> bool: ...
 
+    @contextlib.contextmanager
+    def acquire(self, timeout: float | None = 0) -> Iterator[Connection]:
+        """Borrow a connection and give it back to the pool on exit."""
+        connection = self.connect(timeout)
+        try:
+            yield connection
+        finally:
+            self.disconnect(connection)
+
 
 class ConnectionPool(Pool):
-    def __init__(self, connection_class: type[Connection], pool_size: int = 5):
-        self.pool: queue.Queue[Connection] = queue.Queue(maxsize=pool_size)
+    """
+    Elastic pool: it opens `min_size` connections up front, grows on demand up to `pool_size`
+    and shrinks back to `min_size` closing connections that have been idle for `idle_timeout` seconds.
+    Idle connections are evicted on `connect()`, `disconnect()` and by the maintenance thread.
+
+    Connections older than `max_lifetime` seconds are recycled, and with `pre_ping` a connection is checked
+    before it is handed out. When `maintenance_interval` is set, a background thread evicts and pre-warms
+    connections, so this work stays off the request path.
+
+    With `thread_affinity` every thread keeps the last connection it returned in a thread-local slot
+    and takes it back without touching the shared lock. The shared idle queue is used only on a miss
+    or when the slot is already taken. Other threads can still steal a parked connection when the pool is drained.
+
+    Pass a `monitor` to collect wait times, acquisition rate and leaks, see `stats()`.
+    """
+
+    def __init__(
+        self,
+        connection_class: Callable[[], Connection],
+        pool_size: int = 5,
+        *,
+        min_size: int | None = None,
+        idle_timeout: float | None = None,
+        max_lifetime: float | None = None,
+        pre_ping: bool = False,
+        maintenance_interval: float | None = None,
+        thread_affinity: bool = False,
+        monitor: PoolMonitor | None = None,
+    ):
+        if min_size is None:
+            min_size = pool_size
+        if not 0 <= min_size <= pool_size:
+            raise ValueError("min_size must be between 0 and pool_size")
         self.connection_class = connection_class
+        self.min_size = min_size
+        self.max_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.pre_ping = pre_ping
+        self.thread_affinity = thread_affinity
+        self.monitor = monitor
+        # Number of open connections, both idle and in use
+        self.size = 0
+        # Idle connections with the time they were returned, the most recently used on the right
+        self._idle: deque[tuple[Connection, float]] = deque()
+        self._created_at: dict[Connection, float] = {}
+        # Connections parked by threads, keyed by thread id. Single dict operations are atomic,
+        # so a thread pops its own connection without locks, and others pop it only to steal it.
+        self._affinity: dict[int, Connection] = {}
+        self._available = threading.Condition()
+        # Number of threads waiting for a drained pool, they must not miss a parked connection
+        self._waiting = 0
+        self._disposed = threading.Event()
+        self._maintenance: threading.Thread | None = None
 
-        # Fill the pool with connections
-        for _ in range(pool_size):
-            conn = connection_class()
-            self.pool.put(conn)
+        if maintenance_interval is None:
+            self._prewarm()
+        else:
+            self._maintenance = threading.Thread(
+                target=self._maintain_forever,
+                args=(maintenance_interval,),
+                name="pool-maintenance",
+                daemon=True,
+            )
+            self._maintenance.start()
 
-    def connect(self) -> Connection:
+    def _open(self) -> Connection:
+        connection = self.connection_class()
+        connection.connect()
+        self._created_at[connection] = time.monotonic()
+        return connection
+
+    def _close(self, connection: Connection) -> None:
+        self._created_at.pop(connection, None)
+        connection.disconnect()
+
+    def _is_worn_out(self, connection: Connection, now: float) -> bool:
+        if self.max_lifetime is None:
+            return False
+        created_at = self._created_at.get(connection, now)
+        return now - created_at >= self.max_lifetime
+
+    def connect(self, timeout: float | None = 0) -> Connection:
+        if self.monitor is None:
+            return self._connect(timeout)
+        start = time.perf_counter()
+        connection = self._connect(timeout)
+        self.monitor.on_acquire(connection, time.perf_counter() - start)
+        return connection
+
+    def _connect(self, timeout: float | None) -> Connection:
+        if self.thread_affinity:
+            connection = self._affinity.pop(threading.get_ident(), None)
+            if connection is not None:
+                return self._checked(connection)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        connection = None
+        with self._available:
+            while not self._idle and self.size >= self.max_size:
+                self._waiting += 1
+                try:
+                    connection = self._steal()
+                    if connection is not None:
+                        break
+                    remaining = None
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise EmptyPoolError
+                    self._available.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            else:
+                if self._idle:
+                    connection, _ = self._idle.pop()
+                else:
+                    # Reserve a slot and open the connection outside the lock
+                    self.size += 1
+            # Shrink on the request path too, so the pool doesn't need returns or maintenance for that
+            expired = self._pop_expired(time.monotonic())
+        for conn in expired:
+            self._close(conn)
+        if connection is not None:
+            return self._checked(connection)
         try:
-            connection = self.pool.get_nowait()
+            return self._open()
+        except BaseException:
+            self._release_slot()
+            raise
+
+    def _checked(self, connection: Connection) -> Connection:
+        if not self.pre_ping or connection.is_connected:
             return connection
-        except queue.Empty:
-            raise EmptyPoolError from None
+        # The connection went stale while idle, replace it keeping its slot
+        self._close(connection)
+        try:
+            return self._open()
+        except BaseException:
+            self._release_slot()
+            raise
+
+    def _steal(self) -> Connection | None:
+        for ident in list(self._affinity):
+            connection = self._affinity.pop(ident, None)
+            if connection is not None:
+                return connection
+        return None
 
     def disconnect(self, connection: Connection) -> None:
-        self.pool.put(connection)
+        if self.monitor is not None:
+            self.monitor.on_release(connection)
+        now = time.monotonic()
+        if self._is_worn_out(connection, now):
+            self._close(connection)
+            self._release_slot()
+            return
+        if self.thread_affinity and self._park(connection):
+            return
+        with self._available:
+            self._idle.append((connection, now))
+            expired = self._pop_expired(now)
+            self._available.notify()
+        for conn in expired:
+            self._close(conn)
 
-    def dispose(self) -> None:
-        while True:
+    def _park(self, connection: Connection) -> bool:
+        """Keep the connection in the thread-local slot, return False if it must go to the shared queue."""
+        ident = threading.get_ident()
+        if self._affinity.setdefault(ident, connection) is not connection:
+            return False
+        # A waiter increments the counter before it looks for parked connections,
+        # so either it sees this connection or we see the waiter and hand the connection over.
+        if self._waiting:
+            return self._affinity.pop(ident, None) is not connection
+        return True
+
+    def _pop_expired(self, now: float) -> list[Connection]:
+        """Take out the least recently used connections that stayed idle for too long."""
+        expired: list[Connection] = []
+        if self.idle_timeout is None:
+            return expired
+        while (
+            self._idle
+            and self.size > self.min_size
+            and now - self._idle[0][1] >= self.idle_timeout
+        ):
+            conn, _ = self._idle.popleft()
+            self.size -= 1
+            expired.append(conn)
+        return expired
+
+    def _pop_worn_out(self, now: float) -> list[Connection]:
+        worn_out = [
+            conn for conn, _ in self._idle if self._is_worn_out(conn, now)
+        ]
+        if worn_out:
+            self._idle = deque(
+                item for item in self._idle if item[0] not in worn_out
+            )
+            self.size -= len(worn_out)
+        return worn_out
+
+    def _release_slot(self) -> None:
+        with self._available:
+            self.size -= 1
+            self._available.notify()
+
+    def _prewarm(self) -> None:
+        """Open connections until the pool reaches `min_size`."""
+        with self._available:
+            missing = max(self.min_size - self.size, 0)
+            self.size += missing
+        for opened in range(missing):
             try:
-                conn = self.pool.get_nowait()
-                conn.disconnect()
-            except queue.Empty:
-                break
+                connection = self._open()
+            except BaseException:
+                with self._available:
+                    self.size -= missing - opened
+                    self._available.notify_all()
+                raise
+            with self._available:
+                self._idle.appendleft((connection, time.monotonic()))
+                self._available.notify()
+
+    def maintain(self) -> None:
+        """Evict idle and worn out connections, then pre-warm the pool back to `min_size`."""
+        now = time.monotonic()
+        self._reclaim_orphans(now)
+        with self._available:
+            stale = self._pop_expired(now) + self._pop_worn_out(now)
+        for conn in stale:
+            self._close(conn)
+        self._prewarm()
+
+    def _reclaim_orphans(self, now: float) -> None:
+        """Move connections parked by finished threads back to the shared queue."""
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in list(self._affinity):
+            if ident in alive:
+                continue
+            connection = self._affinity.pop(ident, None)
+            if connection is not None:
+                with self._available:
+                    self._idle.append((connection, now))
+                    self._available.notify()
+
+    def _maintain_forever(self, interval: float) -> None:
+        while not self._disposed.is_set():
+            try:
+                self.maintain()
+            except Exception:
+                logger.exception("Pool maintenance failed")
+            self._disposed.wait(interval)
+
+    def dispose(self) -> None:
+        self._disposed.set()
+        if self._maintenance is not None:
+            self._maintenance.join()
+        with self._available:
+            connections = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            while (connection := self._steal()) is not None:
+                connections.append(connection)
+            self.size -= len(connections)
+        for conn in connections:
+            self._close(conn)
+
+    def stats(self) -> PoolStats:
+        """Snapshot of the pool state for a metrics exporter."""
+        size = self.size
+        idle = len(self._idle) + len(self._affinity)
+        if self.monitor is None:
+            return PoolStats(size=size, in_use=size - idle, idle=idle)
+        return self.monitor.snapshot(size, idle)
 
     def empty(self) -> bool:
-        return self.pool.empty()
+        return not self._idle and not self._affinity
 
     def __enter__(self) -> Self:
         return self
@@ -0,0 +1,128 @@
+"""
+Instrumentation for the object pool. A monitor is attached to a pool only when it is needed,
+a pool without a monitor pays a single attribute check per call.
+
+A metrics exporter polls `ConnectionPool.stats()` and gets an immutable snapshot.
+"""
+
+import bisect
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import Sequence
+
+from src.creational.connections import Connection
+
+# Upper bounds of the wait time buckets in seconds: 1 µs, 2 µs, 4 µs ... ~67 s
+WAIT_BUCKETS = tuple(1e-6 * 2**i for i in range(27))
+
+
+class WaitHistogram:
+    """Histogram with fixed exponential buckets, recording takes O(log buckets)."""
+
+    def __init__(self, bounds: Sequence[float] = WAIT_BUCKETS) -> None:
+        self.bounds = bounds
+        # The last bucket collects everything above the last bound
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += 1
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        """Estimate the q-th percentile (0 < q <= 100) as the upper bound of its bucket."""
+        if not self.total:
+            return 0.0
+        rank = q / 100 * self.total
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+@dataclass(frozen=True)
+class Leak:
+    held_for: float
+    acquired_at: str
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    size: int
+    in_use: int
+    idle: int
+    acquisitions: int = 0
+    acquisitions_per_second: float = 0.0
+    wait_p50: float = 0.0
+    wait_p99: float = 0.0
+    leaks: Sequence[Leak] = field(default_factory=tuple)
+
+
+class PoolMonitor:
+    """
+    Collects acquire wait times and acquisition rate. With `leak_threshold` it also records
+    the stack of every acquisition and reports connections held for longer than the threshold.
+    """
+
+    def __init__(self, leak_threshold: float | None = None) -> None:
+        self.leak_threshold = leak_threshold
+        self.waits = WaitHistogram()
+        self.acquisitions = 0
+        self._borrowed: dict[
+            Connection, tuple[float, traceback.StackSummary]
+        ] = {}
+        self._lock = threading.Lock()
+        self._last_poll = (time.monotonic(), 0)
+
+    def on_acquire(self, connection: Connection, wait: float) -> None:
+        with self._lock:
+            self.waits.record(wait)
+            self.acquisitions += 1
+        if self.leak_threshold is not None:
+            # Skip the pool frames, keep the caller's ones
+            stack = traceback.StackSummary.from_list(
+                traceback.extract_stack(limit=16)[:-2]
+            )
+            self._borrowed[connection] = (time.monotonic(), stack)
+
+    def on_release(self, connection: Connection) -> None:
+        if self.leak_threshold is not None:
+            self._borrowed.pop(connection, None)
+
+    def leaks(self) -> list[Leak]:
+        if self.leak_threshold is None:
+            return []
+        now = time.monotonic()
+        return [
+            Leak(now - acquired, "".join(stack.format()))
+            for acquired, stack in list(self._borrowed.values())
+            if now - acquired >= self.leak_threshold
+        ]
+
+    def snapshot(self, size: int, idle: int) -> PoolStats:
+        """Take a snapshot, the acquisition rate is measured since the previous snapshot."""
+        now = time.monotonic()
+        with self._lock:
+            last_time, last_count = self._last_poll
+            acquisitions = self.acquisitions
+            self._last_poll = (now, acquisitions)
+            p50 = self.waits.percentile(50)
+            p99 = self.waits.percentile(99)
+        elapsed = now - last_time
+        rate = (acquisitions - last_count) / elapsed if elapsed > 0 else 0.0
+        return PoolStats(
+            size=size,
+            in_use=size - idle,
+            idle=idle,
+            acquisitions=acquisitions,
+            acquisitions_per_second=rate,
+            wait_p50=p50,
+            wait_p99=p99,
+            leaks=self.leaks(),
+        )
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Sequence
+from typing import Iterable, Iterator, Sequence
 
 from src.creational.jsonable import Jsonable
 from src.creational.prototype import Cloneable
@@ -37,6 +37,14 @@ class OrangeAdviser(Adviser):
 
 
 class ProductShelf:
-    def __init__(self, category: str, products: Sequence[Product]) -> None:
+    """
+    Products of a category sorted by name. A shelf built from spilled runs
+    holds a lazy iterator, so it can be iterated only once.
+    """
+
+    def __init__(self, category: str, products: Iterable[Product]) -> None:
         self.category = category
         self.products = products
+
+    def __iter__(self) -> Iterator[Product]:
+        return iter(self.products)
@@ -22,9 +22,169 @@ Deep copying, on the other hand, ensures complete independence between the origi
 
 import copy
 from abc import ABC
-from typing import Self
+from typing import Any, Callable, Self
+
+# Values of these types can be shared between clones
+IMMUTABLE = (int, float, complex, str, bytes, bool, type(None), frozenset)
+# Containers that are copied with copy.copy when they hold only immutable values
+FLAT_CONTAINERS = (list, dict, set, bytearray)
 
 
 class Cloneable(ABC):
     def clone(self) -> Self:
         return copy.copy(self)
+
+
+def is_immutable(value: Any) -> bool:
+    if isinstance(value, tuple):
+        return all(is_immutable(item) for item in value)
+    return isinstance(value, IMMUTABLE)
+
+
+def is_tree(value: Any) -> bool:
+    """Lists, dicts and sets nested into each other with immutable leaves."""
+    if is_immutable(value):
+        return True
+    if isinstance(value, dict):
+        return all(is_tree(item) for item in value.values())
+    if isinstance(value, (list, set)):
+        return all(is_tree(item) for item in value)
+    return False
+
+
+def copy_tree(value: Any) -> Any:
+    """Deep copy of a tree without the memo bookkeeping of copy.deepcopy."""
+    cls = type(value)
+    if cls is dict:
+        return {key: copy_tree(item) for key, item in value.items()}
+    if cls is list:
+        return [copy_tree(item) for item in value]
+    if cls is set:
+        return set(value)
+    if cls in IMMUTABLE:
+        return value
+    return copy.deepcopy(value)
+
+
+def copier(value: Any) -> Callable[[Any], Any] | None:
+    """
+    How to copy the value: None if it can be shared, copy.copy for flat containers,
+    copy_tree for nested containers and copy.deepcopy for everything else.
+    """
+    if is_immutable(value):
+        return None
+    if isinstance(value, FLAT_CONTAINERS):
+        items = value.values() if isinstance(value, dict) else value
+        if all(is_immutable(item) for item in items):
+            return copy.copy
+    if is_tree(value):
+        return copy_tree
+    return copy.deepcopy
+
+
+class CopyOnAccess:
+    """
+    Non-data descriptor that copies a mutable field of a copy-on-write clone from its prototype on first access.
+    After that the copy lives in the instance __dict__, and the descriptor is not called anymore.
+    """
+
+    def __init__(self, name: str, copy_func: Callable[[Any], Any]) -> None:
+        self.name = name
+        self.copy_func = copy_func
+
+    def __get__(self, instance: Any, owner: type[Any]) -> Any:
+        if instance is None:
+            return self
+        prototype = instance.__dict__.get("_prototype")
+        if prototype is None or self.name not in prototype.__dict__:
+            raise AttributeError(self.name)
+        value = self.copy_func(prototype.__dict__[self.name])
+        instance.__dict__[self.name] = value
+        return value
+
+
+class ClonePlan:
+    """
+    Clone plan is built once from a prototype: immutable fields are shared,
+    flat containers of immutable values are copied shallowly, everything else is copied deeply.
+    Fields the prototype got after the plan was built are checked on every clone and copied the same way.
+
+    In copy-on-write mode a clone doesn't copy mutable fields at all. They are copied from the prototype
+    when the clone reads them for the first time, so the prototype must not change while its clones exist.
+    Such clones are instances of a subclass that holds the CopyOnAccess descriptors,
+    the original class is left untouched.
+    """
+
+    def __init__(self, prototype: Any, copy_on_write: bool = False) -> None:
+        self.cls: type[Any] = type(prototype)
+        self.copy_on_write = copy_on_write
+        self.copied: dict[str, Callable[[Any], Any]] = {}
+        for name, value in vars(prototype).items():
+            copy_func = copier(value)
+            if copy_func is not None:
+                self.copied[name] = copy_func
+        # Fields the plan knows about, shared or copied
+        self.known = frozenset(vars(prototype))
+        self.clone_cls = self.cls
+        if copy_on_write:
+            self.clone_cls = type(
+                self.cls.__name__,
+                (self.cls,),
+                {
+                    "__module__": self.cls.__module__,
+                    "__qualname__": self.cls.__qualname__,
+                    **{
+                        name: CopyOnAccess(name, copy_func)
+                        for name, copy_func in self.copied.items()
+                    },
+                },
+            )
+
+    def clone(self, prototype: Any) -> Any:
+        obj = object.__new__(self.clone_cls)
+        state = prototype.__dict__
+        if self.copy_on_write:
+            obj.__dict__ = {
+                name: value
+                for name, value in state.items()
+                if name not in self.copied
+            }
+            obj.__dict__["_prototype"] = prototype
+        else:
+            obj.__dict__ = state.copy()
+            for name, copy_func in self.copied.items():
+                if name in state:
+                    obj.__dict__[name] = copy_func(state[name])
+        if not self.known.issuperset(state):
+            for name in state.keys() - self.known:
+                late_copy = copier(state[name])
+                if late_copy is not None:
+                    obj.__dict__[name] = late_copy(state[name])
+        return obj
+
+
+class PrototypeRegistry:
+    """
+    Registry of named prototypes. Every prototype gets its own clone plan when it is registered,
+    the plans are used only by `clone` of this registry.
+    """
+
+    def __init__(self) -> None:
+        self.prototypes: dict[str, Any] = {}
+        self.plans: dict[str, ClonePlan] = {}
+
+    def register(
+        self, name: str, prototype: Cloneable, copy_on_write: bool = False
+    ) -> None:
+        """
+        With `copy_on_write` a clone copies a mutable field on the first read, not on write,
+        and keeps a reference to the prototype in its `_prototype` attribute until then.
+        """
+        self.plans[name] = ClonePlan(prototype, copy_on_write)
+        self.prototypes[name] = prototype
+
+    def clone(self, name: str, **changes: Any) -> Any:
+        obj = self.plans[name].clone(self.prototypes[name])
+        for field, value in changes.items():
+            setattr(obj, field, value)
+        return obj
@@ -4,7 +4,9 @@ Singleton is a creational design pattern that ensures that a class has only one
 
 from __future__ import annotations
 
+import functools
 import logging
+import threading
 from abc import ABC
 from typing import ClassVar, Any, MutableMapping
 
@@ -15,17 +17,55 @@ logger = logging.getLogger(__name__)
 
 # Read more about metaprogramming: https://python-3-patterns-idioms-test.readthedocs.io/en/latest/Metaprogramming.html
 class InheritedSingleton(ABC):
+    """
+    Python calls __init__ after every __new__, even when __new__ returns the existing instance,
+    so the __init__ of every subclass is wrapped to run only once.
+    """
+
     _instance: ClassVar[InheritedSingleton | None] = None
+    _lock: ClassVar[threading.RLock] = threading.RLock()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        init = cls.__init__
+
+        @functools.wraps(init)
+        def __init__(
+            self: InheritedSingleton, *args: Any, **kwargs: Any
+        ) -> None:
+            if "_initialized" in self.__dict__:
+                return
+            with cls._lock:
+                if "_initialized" not in self.__dict__:
+                    init(self, *args, **kwargs)
+                    self.__dict__["_initialized"] = True
+
+        cls.__init__ = __init__  # type: ignore[method-assign, assignment]
 
     def __new__(cls, *args: Any, **kwargs: Any) -> InheritedSingleton:
-        logger.info(f"{cls.__name__}.__new__ args: {args=}, {kwargs=}")
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+        # Fast path: no locks and no logging once the instance exists
+        instance = cls._instance
+        if instance is not None:
+            return instance
+        with cls._lock:
+            # Double-checked locking: another thread could create it while we were waiting
+            if cls._instance is None:
+                logger.info(
+                    "%s.__new__ args: %s, %s", cls.__name__, args, kwargs
+                )
+                cls._instance = super().__new__(cls)
+            return cls._instance
+
+    @classmethod
+    def reset(cls) -> None:
+        """Forget the instance, e.g. between tests."""
+        with cls._lock:
+            cls._instance = None
 
 
 class MetaSingleton(type):
     _instance: Any | None = None
+    _lock = threading.RLock()
 
     def __new__(
         cls,
@@ -35,7 +75,9 @@ class MetaSingleton(type):
         **extra: Any,
     ) -> MetaSingleton:
         """Called before the class is created."""
-        logger.info(f"{cls.__name__}.__new__ args: {name=}, {bases=}, {ns=}")
+        logger.info(
+            "%s.__new__ args: %s, %s, %s", cls.__name__, name, bases, ns
+        )
         return super().__new__(cls, name, bases, ns)
 
     def __init__(
@@ -52,16 +94,34 @@ class MetaSingleton(type):
         and it will have an effect, but doing the same thing in __init__() you won’t get any results from the constructor call.
         """
         logger.info(
-            f"{cls.__name__}.__init__ args: {name=}, {bases=}, {ns=}, {extra=}"
+            "%s.__init__ args: %s, %s, %s, %s",
+            cls.__name__,
+            name,
+            bases,
+            ns,
+            extra,
         )
         super().__init__(name, bases, ns)
 
     def __call__(cls, *args: Any, **kwargs: Any) -> Any:
         """Called when the class instance is initialized."""
-        logger.info(f"{cls.__name__}.__call__ args: {args=}, {kwargs=}")
-        if cls._instance is None:
-            cls._instance = super().__call__(*args, **kwargs)
-        return cls._instance
+        # Fast path: no locks and no logging once the instance exists
+        instance = cls._instance
+        if instance is not None:
+            return instance
+        with cls._lock:
+            # Double-checked locking: another thread could create it while we were waiting
+            if cls._instance is None:
+                logger.info(
+                    "%s.__call__ args: %s, %s", cls.__name__, args, kwargs
+                )
+                cls._instance = super().__call__(*args, **kwargs)
+            return cls._instance
+
+    def reset(cls) -> None:
+        """Forget the instance, e.g. between tests."""
+        with cls._lock:
+            cls._instance = None
 
     @classmethod
     def __prepare__(
@@ -69,7 +129,11 @@ class MetaSingleton(type):
     ) -> MutableMapping[str, object]:
         """Prepare the class namespace. Called when the class code is parsed."""
         logger.info(
-            f"{cls.__name__}.__prepare__ args: {name=}, {bases=}, {kwargs=}"
+            "%s.__prepare__ args: %s, %s, %s",
+            cls.__name__,
+            name,
+            bases,
+            kwargs,
         )
         return super().__prepare__(name, bases, **kwargs)  # noqa
 
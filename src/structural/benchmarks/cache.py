@@ -0,0 +1,50 @@
+import itertools
+import random
+
+from src.creational.benchmarks import timed
+from src.structural.cache import Cache, LFUCache, LRUCache, TTLCache
+from src.structural.db import Database
+from src.structural.decorator import CacheDecorator
+
+KEYS = 100_000
+REQUESTS = 1_000_000
+CACHE_SIZE = 1_000
+# Zipf exponent, the most popular keys are requested much more often than the rest
+ALPHA = 1.1
+
+
+def zipf_keys() -> list[int]:
+    weights = list(
+        itertools.accumulate(1 / rank**ALPHA for rank in range(1, KEYS + 1))
+    )
+    return random.choices(range(KEYS), cum_weights=weights, k=REQUESTS)
+
+
+def run(name: str, cache: Cache[int, str], keys: list[int]) -> None:
+    database = Database()
+    database.data = {key: f"user {key}" for key in range(KEYS)}
+    db = CacheDecorator(database, cache)
+
+    def request_all() -> None:
+        for key in keys:
+            db.get(key)
+
+    _, elapsed = timed(request_all)
+    print(
+        f"{name}: {elapsed:.2f} s, "
+        f"hit ratio {cache.hits / REQUESTS:.1%}, "
+        f"{cache.evictions} evictions"
+    )
+
+
+def main() -> None:
+    keys = zipf_keys()
+    run("Unbounded", LRUCache(), keys)
+    run("LRU", LRUCache(maxsize=CACHE_SIZE), keys)
+    run("LFU", LFUCache(maxsize=CACHE_SIZE), keys)
+    run("TTL", TTLCache(ttl=0.1, maxsize=CACHE_SIZE), keys)
+    run("LRU by bytes", LRUCache(maxbytes=CACHE_SIZE * 100), keys)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import io
+import tracemalloc
+from typing import Callable
+
+from src.creational.benchmarks import measure, timed
+from src.structural.flyweight import Character, FlyweightFactory, Scene
+
+NUMBER = 1_000_000
+COLORS = ["red", "green", "blue"]
+
+
+class Unit:
+    """Extrinsic state kept in an object per unit."""
+
+    def __init__(
+        self, character: Character, color: str, x: int, y: int
+    ) -> None:
+        self.character = character
+        self.color = color
+        self.x = x
+        self.y = y
+
+
+def build[ReturnT](name: str, func: Callable[[], ReturnT]) -> ReturnT:
+    tracemalloc.start()
+    result, elapsed = timed(func)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name}: {elapsed:.2f} s, {memory / NUMBER:.0f} bytes per unit")
+    return result
+
+
+def main() -> None:
+    factory = FlyweightFactory()
+    soldier = factory.get_character("soldier")
+    units = build(
+        "Objects",
+        lambda: [Unit(soldier, COLORS[i % 3], i, -i) for i in range(NUMBER)],
+    )
+
+    def fill() -> Scene:
+        scene = Scene(factory)
+        for i in range(NUMBER):
+            scene.add("soldier", COLORS[i % 3], i, -i)
+        return scene
+
+    scene = build("Scene", fill)
+
+    def render_objects() -> None:
+        out = io.StringIO()
+        for unit in units:
+            out.write(unit.character.render(unit.color, unit.x, unit.y) + "\n")
+
+    measure("Render objects", render_objects)
+    measure(
+        "Render scene in batches", lambda: scene.render_batch(io.StringIO())
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Bounded caches for CacheDecorator. A cache is capped by the number of entries (`maxsize`),
+by the estimated size of keys and values in bytes (`maxbytes`) or both, and evicts by its policy:
+
+* LRUCache - the least recently used entry.
+* LFUCache - the least frequently used entry, the least recently used one among equals.
+* TTLCache - the entry closest to expiration, entries older than `ttl` seconds are dropped anyway.
+
+Every policy gets and sets in O(1), TTLCache amortized. Without caps a cache is unbounded.
+A policy reorders its entries even on reads, so get, set and pop are serialized by a lock.
+"""
+
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+def estimate_size(key: Any, value: Any) -> int:
+    """Shallow size of a cache entry, enough for keys and values of built-in types."""
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+class Cache[K: Hashable, V](ABC):
+    def __init__(
+        self, maxsize: int | None = None, maxbytes: int | None = None
+    ) -> None:
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._sizes: dict[K, int] = {}
+        self._lock = threading.RLock()
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    @abstractmethod
+    def __contains__(self, key: K) -> bool: ...
+
+    @abstractmethod
+    def _get(self, key: K) -> V | None: ...
+
+    @abstractmethod
+    def _put(self, key: K, value: V) -> None:
+        """Insert or replace the entry."""
+
+    @abstractmethod
+    def _remove(self, key: K) -> V | None: ...
+
+    @abstractmethod
+    def _pop_victim(self) -> K:
+        """Remove the entry the policy evicts first and return its key."""
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            value = self._get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            self._set(key, value)
+
+    def _set(self, key: K, value: V) -> None:
+        size = 0
+        if self.maxbytes is not None:
+            size = estimate_size(key, value)
+            if size > self.maxbytes:
+                # The entry would evict everything else and still not fit
+                self._remove(key)
+                self._forget(key)
+                return
+            self._forget(key)
+        if key not in self:
+            # Make room first, so the new entry is never the victim
+            while len(self) and not self._has_room(size):
+                self._evict()
+        self._put(key, value)
+        if self.maxbytes is not None:
+            self._sizes[key] = size
+            self.nbytes += size
+            # A replaced entry could grow
+            while self.nbytes > self.maxbytes:
+                self._evict()
+
+    def pop(self, key: K) -> V | None:
+        with self._lock:
+            value = self._remove(key)
+            self._forget(key)
+        return value
+
+    def _has_room(self, size: int) -> bool:
+        if self.maxsize is not None and len(self) >= self.maxsize:
+            return False
+        return self.maxbytes is None or self.nbytes + size <= self.maxbytes
+
+    def _evict(self) -> None:
+        self._forget(self._pop_victim())
+        self.evictions += 1
+
+    def _forget(self, key: K) -> None:
+        if self.maxbytes is not None:
+            self.nbytes -= self._sizes.pop(key, 0)
+
+
+class LRUCache[K: Hashable, V](Cache[K, V]):
+    def __init__(
+        self, maxsize: int | None = None, maxbytes: int | None = None
+    ) -> None:
+        super().__init__(maxsize, maxbytes)
+        # The least recently used entry on the left
+        self._data: OrderedDict[K, V] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def _get(self, key: K) -> V | None:
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def _put(self, key: K, value: V) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+
+    def _remove(self, key: K) -> V | None:
+        return self._data.pop(key, None)
+
+    def _pop_victim(self) -> K:
+        return self._data.popitem(last=False)[0]
+
+
+class LFUCache[K: Hashable, V](Cache[K, V]):
+    def __init__(
+        self, maxsize: int | None = None, maxbytes: int | None = None
+    ) -> None:
+        super().__init__(maxsize, maxbytes)
+        self._data: dict[K, V] = {}
+        self._counts: dict[K, int] = {}
+        # Keys by use count, the least recently used on the left
+        self._buckets: dict[int, OrderedDict[K, None]] = {}
+        self._min_count = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def _get(self, key: K) -> V | None:
+        value = self._data.get(key)
+        if value is not None:
+            self._touch(key)
+        return value
+
+    def _touch(self, key: K) -> None:
+        count = self._counts[key]
+        self._unlink(key, count)
+        if self._min_count == count and count not in self._buckets:
+            self._min_count = count + 1
+        self._link(key, count + 1)
+
+    def _link(self, key: K, count: int) -> None:
+        self._counts[key] = count
+        bucket = self._buckets.get(count)
+        if bucket is None:
+            bucket = self._buckets[count] = OrderedDict()
+        bucket[key] = None
+
+    def _unlink(self, key: K, count: int) -> None:
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+
+    def _put(self, key: K, value: V) -> None:
+        if key in self._data:
+            self._data[key] = value
+            self._touch(key)
+            return
+        self._data[key] = value
+        self._link(key, 1)
+        self._min_count = 1
+
+    def _remove(self, key: K) -> V | None:
+        value = self._data.pop(key, None)
+        if value is not None:
+            self._unlink(key, self._counts.pop(key))
+        return value
+
+    def _pop_victim(self) -> K:
+        if self._min_count not in self._buckets:
+            # The least used entries were removed with pop, not evicted
+            self._min_count = min(self._buckets)
+        key = next(iter(self._buckets[self._min_count]))
+        self._remove(key)
+        return key
+
+
+class TTLCache[K: Hashable, V](Cache[K, V]):
+    """
+    Entries expire `ttl` seconds after they were set. The ttl is the same for all entries,
+    so the order of insertion is the order of expiration, and expired entries are dropped from the left.
+    Expired entries are counted as evictions.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        maxsize: int | None = None,
+        maxbytes: int | None = None,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__(maxsize, maxbytes)
+        self.ttl = ttl
+        self.timer = timer
+        self._data: OrderedDict[K, tuple[V, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        item = self._data.get(key)
+        return item is not None and item[1] > self.timer()
+
+    def _get(self, key: K) -> V | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at <= self.timer():
+            self._expire()
+            return None
+        return value
+
+    def _set(self, key: K, value: V) -> None:
+        self._expire()
+        super()._set(key, value)
+
+    def _expire(self) -> None:
+        now = self.timer()
+        while self._data:
+            key, (_, expires_at) = next(iter(self._data.items()))
+            if expires_at > now:
+                break
+            self._evict()
+
+    def _put(self, key: K, value: V) -> None:
+        self._data[key] = (value, self.timer() + self.ttl)
+        self._data.move_to_end(key)
+
+    def _remove(self, key: K) -> V | None:
+        item = self._data.pop(key, None)
+        return None if item is None else item[0]
+
+    def _pop_victim(self) -> K:
+        return self._data.popitem(last=False)[0]
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Mapping
 
 
 class IDatabase(ABC):
@@ -8,6 +9,10 @@ class IDatabase(ABC):
     @abstractmethod
     def set(self, id: int, data: str) -> str: ...
 
+    def set_many(self, items: Mapping[int, str]) -> None:
+        for id, data in items.items():
+            self.set(id, data)
+
 
 class Database(IDatabase):
     def __init__(self) -> None:
@@ -19,3 +24,6 @@ class Database(IDatabase):
     def set(self, id: int, data: str) -> str:
         self.data[id] = data
         return self.data[id]
+
+    def set_many(self, items: Mapping[int, str]) -> None:
+        self.data.update(items)
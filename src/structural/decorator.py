@@ -9,11 +9,18 @@ import functools
 import logging
 import time
 from abc import ABC
-from typing import Callable, Literal, overload, TypeVar
+from typing import Any, Callable, Literal, Self, overload, TypeVar
 
 from typing_extensions import ParamSpec
 
+from src.structural.cache import Cache, LRUCache
 from src.structural.db import IDatabase
+from src.structural.single_flight import SingleFlight
+from src.structural.write_behind import (
+    InFlightLoads,
+    WriteBehind,
+    WriteMode,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -30,18 +37,83 @@ class IDecorator(IDatabase, ABC):
 
 
 class CacheDecorator(IDecorator):
-    def __init__(self, decorated: IDatabase):
+    """
+    Caches reads of the decorated database. Pass a bounded cache to pick the eviction policy,
+    by default the cache is unbounded. `hit` tells whether the last read was served from the cache,
+    the cache counts hits, misses and evictions.
+
+    `write_mode` picks how writes reach the cache and the database, see WriteMode.
+    In WriteMode.BEHIND writes are buffered until `batch_size` keys are pending, `flush_interval` passes or close.
+    """
+
+    def __init__(
+        self,
+        decorated: IDatabase,
+        cache: Cache[int, str] | None = None,
+        write_mode: WriteMode = WriteMode.AROUND,
+        *,
+        batch_size: int = 100,
+        flush_interval: float | None = None,
+    ):
         super().__init__(decorated)
-        self.cache: dict[int, str] = {}
+        self.cache = LRUCache[int, str]() if cache is None else cache
         self.hit = False
+        self._flights = SingleFlight[int, str]()
+        self._loads = InFlightLoads[int]()
+        self.write_mode = write_mode
+        self.write_behind = None
+        if write_mode == WriteMode.BEHIND:
+            self.write_behind = WriteBehind(
+                decorated, batch_size, flush_interval
+            )
 
     def get(self, id: int) -> str:
-        if id not in self.cache:
-            self.cache[id] = super().get(id)
-            self.hit = False
-        else:
-            self.hit = True
-        return self.cache[id]
+        data = self.cache.get(id)
+        self.hit = data is not None
+        if data is None:
+            # Concurrent misses of the same key wait for one load
+            data = self._flights.do(id, functools.partial(self._load, id))
+        return data
+
+    def _load(self, id: int) -> str:
+        with self._loads.load(id):
+            data = None
+            if self.write_behind is not None:
+                data = self.write_behind.get(id)
+            if data is None:
+                data = super().get(id)
+            with self._loads.lock:
+                # A write since the load started makes the value stale
+                if not self._loads.is_stale(id):
+                    self.cache.set(id, data)
+        return data
+
+    def set(self, id: int, data: str) -> str:
+        if self.write_behind is not None:
+            self.write_behind.set(id, data)
+            with self._loads.lock:
+                self._loads.invalidate(id)
+                self.cache.set(id, data)
+            return data
+        data = super().set(id, data)
+        with self._loads.lock:
+            self._loads.invalidate(id)
+            if self.write_mode == WriteMode.THROUGH:
+                self.cache.set(id, data)
+            else:
+                self.cache.pop(id)
+        return data
+
+    def close(self) -> None:
+        """Write the buffered writes to the database."""
+        if self.write_behind is not None:
+            self.write_behind.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.close()
 
 
 def measure_time[**P, T](
@@ -2,9 +2,16 @@
 Flyweight is a structural pattern used to efficiently manage large numbers of small objects.
 The basic idea is to separate an object's state into internal and external, minimizing memory usage by
 sharing common data.
+
+With millions of units even the external state is too expensive to keep in Python objects.
+Scene stores it in parallel typed arrays, a unit is just an index into them.
 """
 
-from typing import MutableMapping
+import threading
+import weakref
+from array import array
+from dataclasses import dataclass
+from typing import MutableMapping, TextIO
 
 
 class Character:
@@ -16,11 +23,135 @@ class Character:
         return f"Soldier at ({x}, {y}) with color {color}"
 
 
+@dataclass(frozen=True)
+class FlyweightStats:
+    hits: int
+    misses: int
+    size: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
 class FlyweightFactory:
-    def __init__(self) -> None:
-        self.characters: MutableMapping[str, Character] = {}
+    """
+    Thread-safe factory: a lookup of an existing flyweight takes no lock, a miss is handled
+    under the lock, so two threads never create two flyweights of the same type.
+
+    With `weak=True` the factory doesn't keep flyweights alive, a type nobody uses anymore is collected.
+    Hits are counted without the lock, so under contention they are approximate, misses are exact.
+    """
+
+    def __init__(self, weak: bool = False) -> None:
+        self.characters: MutableMapping[str, Character] = (
+            weakref.WeakValueDictionary() if weak else {}
+        )
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
 
     def get_character(self, character_type: str) -> Character:
-        if character_type not in self.characters:
-            self.characters[character_type] = Character(character_type)
-        return self.characters[character_type]
+        # Lock-free fast path, a single lookup is atomic
+        character = self.characters.get(character_type)
+        if character is not None:
+            self.hits += 1
+            return character
+        with self._lock:
+            # Another thread could create the flyweight while we were waiting for the lock
+            character = self.characters.get(character_type)
+            if character is None:
+                self.misses += 1
+                character = Character(character_type)
+                self.characters[character_type] = character
+            else:
+                self.hits += 1
+        return character
+
+    def stats(self) -> FlyweightStats:
+        return FlyweightStats(self.hits, self.misses, len(self.characters))
+
+
+class Scene:
+    """
+    Units of a scene: unit i is drawn by the flyweight `characters[flyweight_ids[i]]`
+    at `(xs[i], ys[i])` with the color `colors[color_ids[i]]`, 12 bytes per unit.
+    A scene holds up to 65536 characters and colors, coordinates are 32-bit integers.
+    """
+
+    def __init__(self, factory: FlyweightFactory) -> None:
+        self.factory = factory
+        self.characters: list[Character] = []
+        self.colors: list[str] = []
+        self.flyweight_ids = array("H")
+        self.color_ids = array("H")
+        self.xs = array("i")
+        self.ys = array("i")
+        self._character_index: dict[str, int] = {}
+        self._color_index: dict[str, int] = {}
+
+    def add(self, character_type: str, color: str, x: int, y: int) -> int:
+        """Place a unit and return its index. If the unit doesn't fit, the scene is left unchanged."""
+        flyweight_id = self._character_index.get(character_type)
+        character = None
+        if flyweight_id is None:
+            flyweight_id = len(self.characters)
+            character = self.factory.get_character(character_type)
+        color_id = self._color_index.get(color)
+        new_color = color_id is None
+        if color_id is None:
+            color_id = len(self.colors)
+        unit = len(self.xs)
+        try:
+            self.flyweight_ids.append(flyweight_id)
+            self.color_ids.append(color_id)
+            self.xs.append(x)
+            self.ys.append(y)
+        except BaseException:
+            # An id or a coordinate is out of range, drop what was appended
+            for column in (
+                self.flyweight_ids,
+                self.color_ids,
+                self.xs,
+                self.ys,
+            ):
+                del column[unit:]
+            raise
+        if character is not None:
+            self.characters.append(character)
+            self._character_index[character_type] = flyweight_id
+        if new_color:
+            self.colors.append(color)
+            self._color_index[color] = color_id
+        return unit
+
+    def move(self, unit: int, x: int, y: int) -> None:
+        self.xs[unit] = x
+        self.ys[unit] = y
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    def render(self, unit: int) -> str:
+        character = self.characters[self.flyweight_ids[unit]]
+        color = self.colors[self.color_ids[unit]]
+        return character.render(color, self.xs[unit], self.ys[unit])
+
+    def render_batch(self, fp: TextIO, chunk_size: int = 10_000) -> None:
+        """Write one line per unit, formatting and writing `chunk_size` units at a time."""
+        renders = [character.render for character in self.characters]
+        colors = self.colors
+        for start in range(0, len(self), chunk_size):
+            end = start + chunk_size
+            lines = [
+                renders[flyweight_id](colors[color_id], x, y)
+                for flyweight_id, color_id, x, y in zip(
+                    self.flyweight_ids[start:end],
+                    self.color_ids[start:end],
+                    self.xs[start:end],
+                    self.ys[start:end],
+                )
+            ]
+            lines.append("")
+            fp.write("\n".join(lines))
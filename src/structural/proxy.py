@@ -4,18 +4,79 @@ A proxy controls access to the original object, allowing you to perform somethin
 gets through to the original object.
 """
 
+import functools
+from typing import Any, Self
+
 from src.structural.db import IDatabase, Database
+from src.structural.single_flight import SingleFlight
+from src.structural.write_behind import (
+    InFlightLoads,
+    WriteBehind,
+    WriteMode,
+)
 
 
 class CachedDatabase(IDatabase):
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        write_mode: WriteMode = WriteMode.AROUND,
+        *,
+        batch_size: int = 100,
+        flush_interval: float | None = None,
+    ) -> None:
         self.cache: dict[int, str] = {}
         self._proxied = Database()
+        self._flights = SingleFlight[int, str]()
+        self._loads = InFlightLoads[int]()
+        self.write_mode = write_mode
+        self.write_behind = None
+        if write_mode == WriteMode.BEHIND:
+            self.write_behind = WriteBehind(
+                self._proxied, batch_size, flush_interval
+            )
 
     def get(self, id: int) -> str:
-        if id not in self.cache:
-            self.cache[id] = self._proxied.get(id)
-        return self.cache[id]
+        data = self.cache.get(id)
+        if data is None:
+            # Concurrent misses of the same key wait for one load
+            data = self._flights.do(id, functools.partial(self._load, id))
+        return data
+
+    def _load(self, id: int) -> str:
+        with self._loads.load(id):
+            data = None
+            if self.write_behind is not None:
+                data = self.write_behind.get(id)
+            if data is None:
+                data = self._proxied.get(id)
+            with self._loads.lock:
+                # A write since the load started makes the value stale
+                if not self._loads.is_stale(id):
+                    self.cache[id] = data
+        return data
 
     def set(self, id: int, data: str) -> str:
-        return self._proxied.set(id, data)
+        if self.write_behind is not None:
+            self.write_behind.set(id, data)
+            with self._loads.lock:
+                self._loads.invalidate(id)
+                self.cache[id] = data
+            return data
+        data = self._proxied.set(id, data)
+        with self._loads.lock:
+            self._loads.invalidate(id)
+            if self.write_mode == WriteMode.THROUGH:
+                self.cache[id] = data
+            else:
+                self.cache.pop(id, None)
+        return data
+
+    def close(self) -> None:
+        if self.write_behind is not None:
+            self.write_behind.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.close()
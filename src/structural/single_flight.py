@@ -0,0 +1,58 @@
+"""
+Single flight coalesces concurrent calls for the same key: the first caller runs the function,
+the others wait for its result instead of calling it again. The result or the exception is shared
+by all of them. In front of a cache it turns a burst of misses on a cold key into one load.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Coroutine, Hashable
+
+
+class SingleFlight[K: Hashable, V]:
+    def __init__(self) -> None:
+        self._calls: dict[K, Future[V]] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: K, func: Callable[[], V]) -> V:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                leader = False
+            else:
+                leader = True
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class AsyncSingleFlight[K: Hashable, V]:
+    """
+    The asyncio variant. The function runs in its own task, so a cancelled caller
+    doesn't cancel the load for the others.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[K, asyncio.Task[V]] = {}
+
+    async def do(
+        self, key: K, func: Callable[[], Coroutine[Any, Any, V]]
+    ) -> V:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.create_task(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(task)
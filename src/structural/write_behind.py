@@ -0,0 +1,142 @@
+"""
+Write policies of a cache in front of a database:
+
+* WriteMode.AROUND - writes go to the database, the cached value is dropped.
+* WriteMode.THROUGH - writes go to the database and the cache together.
+* WriteMode.BEHIND - writes go to the cache and a WriteBehind buffer that writes them to the database later.
+
+Whatever the mode, a load that was in flight during a write must not cache the value it read before the write,
+InFlightLoads tracks such loads.
+"""
+
+import contextlib
+import logging
+import threading
+from enum import StrEnum
+from typing import Self, Any, Hashable, Iterator
+
+from src.structural.db import IDatabase
+
+logger = logging.getLogger(__name__)
+
+
+class WriteMode(StrEnum):
+    AROUND = "around"
+    THROUGH = "through"
+    BEHIND = "behind"
+
+
+class InFlightLoads[K: Hashable]:
+    """
+    Keys being loaded into a cache, one load per key at a time (see SingleFlight).
+    A write marks the load of its key stale. Hold `lock` while checking `is_stale` and caching the loaded value,
+    and while invalidating the load and updating the cache on a write, so the two can't interleave.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self._stale: dict[K, bool] = {}
+
+    @contextlib.contextmanager
+    def load(self, key: K) -> Iterator[None]:
+        with self.lock:
+            self._stale[key] = False
+        try:
+            yield
+        finally:
+            with self.lock:
+                del self._stale[key]
+
+    def is_stale(self, key: K) -> bool:
+        return self._stale.get(key, False)
+
+    def invalidate(self, key: K) -> None:
+        if key in self._stale:
+            self._stale[key] = True
+
+
+class WriteBehind:
+    """
+    Buffers writes to a database and writes them in batches with `set_many`. Repeated writes of a key
+    are coalesced, only the last value reaches the database. A batch is written when `batch_size` keys
+    are pending, every `flush_interval` seconds from a background thread if it is set, and on close.
+    """
+
+    def __init__(
+        self,
+        database: IDatabase,
+        batch_size: int = 100,
+        flush_interval: float | None = None,
+    ) -> None:
+        self.database = database
+        self.batch_size = batch_size
+        # Number of keys written to the database
+        self.writes = 0
+        self._pending: dict[int, str] = {}
+        # The batch being written, readers still see it
+        self._flushing: dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher: threading.Thread | None = None
+        if flush_interval is not None:
+            self._flusher = threading.Thread(
+                target=self._flush_forever,
+                args=(flush_interval,),
+                name="write-behind",
+                daemon=True,
+            )
+            self._flusher.start()
+
+    def get(self, id: int) -> str | None:
+        """The value that is not written to the database yet."""
+        with self._lock:
+            data = self._pending.get(id)
+            return self._flushing.get(id) if data is None else data
+
+    def set(self, id: int, data: str) -> None:
+        if self._closed.is_set():
+            raise RuntimeError("Write-behind buffer is closed")
+        with self._lock:
+            self._pending[id] = data
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._flushing = batch
+            if not batch:
+                return
+            try:
+                self.database.set_many(batch)
+            except BaseException:
+                # Put the batch back under the writes made since
+                with self._lock:
+                    self._pending = batch | self._pending
+                raise
+            finally:
+                with self._lock:
+                    self._flushing = {}
+            self.writes += len(batch)
+
+    def _flush_forever(self, interval: float) -> None:
+        while not self._closed.wait(interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Write-behind flush failed")
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.close()
@@ -1,13 +1,44 @@
+import asyncio
+import gc
+import io
+import multiprocessing
+import threading
+import time
+import types
+
 import pytest
 
-from src.creational.connections import MockConnection
+from src.creational import binary, columnar
+from src.creational.async_pool import AsyncConnectionPool
+from src.creational.builder import ProductShelfBuilder
+from src.creational.columnar import ColumnarShelf
+from src.creational.connections import (
+    AsyncMockConnection,
+    Connection,
+    MockConnection,
+)
 from src.creational.db import (
     Database,
+    RoundRobinBalancer,
 )
+from src.creational.di import Container, Lifetime
 from src.creational.di_example import say_hello
-from src.creational.monostate import DatabaseMonostate
-from src.creational.multiton import DatabaseMultiton
+from src.creational.factories import (
+    ProductRegistryFactory,
+    simple_factory_make_product,
+)
+from src.creational.lazy import async_lazy, lazy
+from src.creational.monostate import (
+    DatabaseMonostate,
+    DatabaseSharedMonostate,
+    SharedField,
+    SharedMonostate,
+)
+from src.creational.multiton import DatabaseMultiton, Multiton
 from src.creational.pool import ConnectionPool, EmptyPoolError
+from src.creational.pool_stats import PoolMonitor, WaitHistogram
+from src.creational.products import Apple, Orange, Product
+from src.creational.prototype import PrototypeRegistry
 from src.creational.singleton import (
     DatabaseInheritedSingleton,
     DatabaseMetaSingleton,
@@ -24,14 +55,112 @@ from src.creational.singleton import (
 def test_singleton_and_lazy(db_type: type[Database]) -> None:
     # Singleton
     db = db_type(":memory:")
-    new_db = db_type(":not_memory:")
-    assert db is new_db
-    assert db.db_url is new_db.db_url
+    primary = db.primary
+    with db.writer():
+        # A repeated call doesn't initialize the instance again
+        new_db = db_type(":not_memory:")
+        assert db is new_db
+        assert db.db_url == ":memory:"
+        assert new_db.primary is primary
+        assert primary.outstanding == 1
 
     # Lazy Initialization
     assert db.connection is db.connection
     assert db.connection is new_db.connection
 
+    # Concurrent first construction creates one instance
+    db_type.reset()  # type: ignore[attr-defined]
+    instances: list[Database] = []
+    threads = [
+        threading.Thread(target=lambda: instances.append(db_type(":memory:")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert instances[0] is not db
+    assert all(instance is instances[0] for instance in instances)
+
+
+def test_lazy() -> None:
+    class Service:
+        calls = 0
+
+        @lazy
+        def resource(self) -> object:
+            Service.calls += 1
+            time.sleep(0.01)
+            return object()
+
+    service = Service()
+    threads = [
+        threading.Thread(target=lambda: service.resource) for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert Service.calls == 1
+    first = service.resource
+
+    Service.resource.reset(service)
+    assert service.resource is not first
+    assert Service.calls == 2
+    # Every instance has its own value
+    assert Service().resource is not service.resource
+
+
+def test_lazy_instances_do_not_block_each_other() -> None:
+    started = threading.Event()
+    other_done = threading.Event()
+
+    class Service:
+        def __init__(self, blocking: bool) -> None:
+            self.blocking = blocking
+
+        @lazy
+        def resource(self) -> bool:
+            if not self.blocking:
+                return True
+            started.set()
+            # Times out if the other instance waits for our lock
+            return other_done.wait(5)
+
+    slow, fast = Service(blocking=True), Service(blocking=False)
+    thread = threading.Thread(target=lambda: slow.resource)
+    thread.start()
+    started.wait(5)
+    fast.resource
+    other_done.set()
+    thread.join()
+    assert slow.resource is True
+    assert "resource.lock" not in vars(slow)
+
+
+def test_async_lazy() -> None:
+    class Service:
+        calls = 0
+
+        @async_lazy
+        async def resource(self) -> object:
+            Service.calls += 1
+            await asyncio.sleep(0.01)
+            return object()
+
+    async def main() -> None:
+        service = Service()
+        values = await asyncio.gather(*(service.resource for _ in range(8)))
+        assert Service.calls == 1
+        assert all(value is values[0] for value in values)
+        assert await service.resource is values[0]
+
+        Service.resource.reset(service)
+        assert await service.resource is not values[0]
+        assert Service.calls == 2
+
+    asyncio.run(main())
+
 
 def test_multiton() -> None:
     # Multiton
@@ -42,6 +171,70 @@ def test_multiton() -> None:
     db2 = DatabaseMultiton(":not_memory:")
     assert db is not db2
 
+    # Keyword values are a part of the key
+    assert DatabaseMultiton(":memory:", replica_urls=("a",)) is not (
+        DatabaseMultiton(":memory:", replica_urls=("b",))
+    )
+
+
+def test_multiton_unhashable_arguments() -> None:
+    db = DatabaseMultiton(":memory:", replica_urls=["a"])
+    assert DatabaseMultiton(":memory:", replica_urls=["a"]) is db
+    assert DatabaseMultiton(":memory:", replica_urls=["b"]) is not db
+    assert DatabaseMultiton(":memory:", replica_urls=("a",)) is not db
+
+    class Options(metaclass=Multiton):
+        def __init__(self, options: object) -> None:
+            self.options = options
+
+    assert Options({"a": [1], "b": {2}}) is Options({"b": {2}, "a": [1]})
+    with pytest.raises(TypeError, match="Argument #0 of type bytearray"):
+        Options(bytearray())
+
+
+def test_multiton_bounded() -> None:
+    evicted: list[Database] = []
+
+    class LRUDatabase(
+        Database, metaclass=Multiton, maxsize=2, on_evict=evicted.append
+    ):
+        pass
+
+    a = LRUDatabase("a")
+    b = LRUDatabase("b")
+    assert LRUDatabase("a") is a
+    LRUDatabase("c")
+    # "b" is the least recently used
+    assert evicted == [b]
+    assert LRUDatabase("a") is a
+
+    class WeakDatabase(Database, metaclass=Multiton, weak=True):
+        pass
+
+    weak = WeakDatabase("a")
+    assert WeakDatabase("a") is weak
+    del weak
+    gc.collect()
+    assert not WeakDatabase._instances
+
+
+def test_multiton_threads() -> None:
+    class SlowDatabase(Database, metaclass=Multiton):
+        def __init__(self, db_url: str) -> None:
+            time.sleep(0.01)
+            super().__init__(db_url)
+
+    instances: list[SlowDatabase] = []
+    threads = [
+        threading.Thread(target=lambda: instances.append(SlowDatabase("a")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(instance is instances[0] for instance in instances)
+
 
 def test_monostate() -> None:
     # Monostate
@@ -51,6 +244,84 @@ def test_monostate() -> None:
     assert db.db_url == new_db.db_url
 
 
+class Counter(SharedMonostate):
+    value = SharedField(int)
+    ratio = SharedField(float)
+    payload = SharedField(bytes, 8)
+
+
+class Flags(SharedMonostate):
+    enabled = SharedField(bool)
+
+
+class CounterWithFlags(Flags, Counter):
+    pass
+
+
+def set_shared_state() -> None:
+    DatabaseSharedMonostate(":not_memory:")
+    counter = Counter()
+    counter.value = 42
+    counter.payload = b"worker"
+
+
+def test_shared_monostate() -> None:
+    DatabaseSharedMonostate.create()
+    Counter.create()
+    try:
+        db = DatabaseSharedMonostate(":memory:")
+        counter = Counter()
+        assert counter.value == 0
+        counter.ratio = 0.5
+        assert Counter().ratio == 0.5
+
+        # A forked worker changes the state of this process
+        process = multiprocessing.get_context("fork").Process(
+            target=set_shared_state
+        )
+        process.start()
+        process.join()
+        assert process.exitcode == 0
+        assert db.db_url == ":not_memory:"
+        assert counter.value == 42
+        assert counter.payload == b"worker"
+        with pytest.raises(ValueError):
+            counter.payload = b"too long value"
+    finally:
+        DatabaseSharedMonostate.unlink()
+        Counter.unlink()
+
+
+def test_shared_monostate_layout() -> None:
+    # Every class has its own layout, a subclass doesn't move the fields of its bases
+    assert Flags._shared_offsets == {"enabled": 0}
+    assert CounterWithFlags._shared_offsets["enabled"] == Counter._shared_size
+    Flags.create()
+    CounterWithFlags.create()
+    try:
+        Flags().enabled = True
+        CounterWithFlags().value = 7
+        assert Flags().enabled
+        assert not CounterWithFlags().enabled
+        assert CounterWithFlags().value == 7
+    finally:
+        Flags.unlink()
+        CounterWithFlags.unlink()
+
+
+def test_shared_monostate_subclass_state() -> None:
+    # A subclass doesn't inherit the block of its base, it needs its own create()
+    Counter.create()
+    try:
+        with pytest.raises(RuntimeError, match="call create()"):
+            CounterWithFlags().value = 1
+        CounterWithFlags.unlink()
+        Counter().value = 3
+        assert Counter().value == 3
+    finally:
+        Counter.unlink()
+
+
 def test_pool() -> None:
     # Object Pool
     with ConnectionPool(MockConnection, 2) as pool:
@@ -65,5 +336,584 @@ def test_pool() -> None:
     assert pool.empty()
 
 
+def test_elastic_pool() -> None:
+    with ConnectionPool(MockConnection, 2, min_size=0, idle_timeout=0) as pool:
+        assert pool.size == 0
+        with pool.acquire() as conn, pool.acquire() as conn2:
+            assert conn.is_connected
+            assert conn2.is_connected
+            assert pool.size == 2
+            with pytest.raises(EmptyPoolError):
+                pool.connect(timeout=0.01)
+        # Idle connections are closed, the pool shrinks back to min_size
+        assert pool.size == 0
+        assert not conn.is_connected
+
+
+def test_elastic_pool_shrinks_on_connect() -> None:
+    with ConnectionPool(
+        MockConnection, 2, min_size=0, idle_timeout=0.05
+    ) as pool:
+        with pool.acquire() as conn, pool.acquire() as conn2:
+            pass
+        assert pool.size == 2
+        time.sleep(0.06)
+        # The most recently used connection is reused, the other one is closed
+        with pool.acquire() as reused:
+            assert reused is conn
+            assert pool.size == 1
+        assert not conn2.is_connected
+
+
+def test_pool_timeout() -> None:
+    with ConnectionPool(MockConnection, 1) as pool:
+        conn = pool.connect()
+        timer = threading.Timer(0.05, pool.disconnect, args=(conn,))
+        timer.start()
+        start = time.monotonic()
+        assert pool.connect(timeout=1) is conn
+        assert time.monotonic() - start < 1
+        timer.join()
+
+
+def test_pool_maintenance() -> None:
+    with ConnectionPool(
+        MockConnection,
+        2,
+        min_size=1,
+        max_lifetime=60,
+        pre_ping=True,
+        maintenance_interval=0.01,
+    ) as pool:
+        # Pre-warming happens in the background
+        deadline = time.monotonic() + 1
+        while pool.empty() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert pool.size == 1
+
+        # Pre-ping replaces a connection that went stale while idle
+        with pool.acquire() as conn:
+            pass
+        conn.disconnect()
+        with pool.acquire() as fresh:
+            assert fresh is not conn
+            assert fresh.is_connected
+
+        # Connections are recycled after max_lifetime
+        pool.max_lifetime = 0
+        pool.maintain()
+        assert pool.size == 1
+        with pool.acquire() as recycled:
+            assert recycled is not fresh
+        assert not fresh.is_connected
+
+
+def test_pool_thread_affinity() -> None:
+    with ConnectionPool(MockConnection, 1, thread_affinity=True) as pool:
+        with pool.acquire() as conn:
+            pass
+        # The connection is parked for this thread and comes back to it
+        with pool.acquire() as same:
+            assert same is conn
+
+        # Another thread steals the parked connection when the pool is drained
+        stolen: list[Connection] = []
+        thread = threading.Thread(target=lambda: stolen.append(pool.connect()))
+        thread.start()
+        thread.join()
+        assert stolen == [conn]
+        pool.disconnect(conn)
+    assert pool.empty()
+
+
+def test_pool_stats() -> None:
+    with ConnectionPool(MockConnection, 2) as pool:
+        stats = pool.stats()
+        assert (stats.size, stats.in_use, stats.idle) == (2, 0, 2)
+
+    monitor = PoolMonitor(leak_threshold=0)
+    with ConnectionPool(MockConnection, 2, monitor=monitor) as pool:
+        with pool.acquire():
+            pass
+        leaked = pool.connect()
+        stats = pool.stats()
+        assert (stats.size, stats.in_use, stats.idle) == (2, 1, 1)
+        assert stats.acquisitions == 2
+        assert stats.acquisitions_per_second > 0
+        assert 0 < stats.wait_p50 <= stats.wait_p99
+        # The leak report points at the line that took the connection
+        assert len(stats.leaks) == 1
+        assert "leaked = pool.connect()" in stats.leaks[0].acquired_at
+        pool.disconnect(leaked)
+        assert not pool.stats().leaks
+
+
+def test_wait_histogram() -> None:
+    histogram = WaitHistogram()
+    for _ in range(98):
+        histogram.record(0.001)
+    histogram.record(0.5)
+    histogram.record(0.5)
+    assert histogram.percentile(50) <= 0.002
+    assert histogram.percentile(99) == 0.5
+
+
+def test_async_pool() -> None:
+    async def client(
+        pool: AsyncConnectionPool, name: str, order: list[str]
+    ) -> None:
+        async with pool.acquire(timeout=None) as conn:
+            assert conn.is_connected
+            order.append(name)
+            await asyncio.sleep(0)
+
+    async def main() -> None:
+        async with AsyncConnectionPool(
+            AsyncMockConnection, 1, min_size=1
+        ) as pool:
+            order: list[str] = []
+            conn = await pool.connect()
+            with pytest.raises(EmptyPoolError):
+                await pool.connect(timeout=0.01)
+            # Waiters are served in the order they came
+            tasks = [
+                asyncio.create_task(client(pool, name, order))
+                for name in "abc"
+            ]
+            await asyncio.sleep(0)
+            await pool.disconnect(conn)
+            await asyncio.gather(*tasks)
+            assert order == ["a", "b", "c"]
+            assert pool.size == 1
+        assert not conn.is_connected
+
+    asyncio.run(main())
+
+
+def test_execute_many() -> None:
+    conn = MockConnection()
+    queries = ["SELECT 1", "SELECT 2", "SELECT 1"]
+    assert conn.execute_many(queries) == [{"key": "value"}] * 3
+    # Two statements are prepared, then the batch takes one round trip
+    assert conn.round_trips == 3
+    assert conn.query == "SELECT 1"
+
+    # Cached statements are not prepared again
+    conn.execute_query("SELECT 2")
+    assert conn.round_trips == 4
+    assert list(conn.statements) == ["SELECT 1", "SELECT 2"]
+
+
+def test_pipeline() -> None:
+    conn = MockConnection()
+    with conn.pipeline(batch_size=2) as pipeline:
+        indexes = [pipeline.execute(f"SELECT {i}") for i in range(5)]
+    assert indexes == [0, 1, 2, 3, 4]
+    assert len(pipeline.results) == 5
+    # 5 prepares and 3 batches
+    assert conn.round_trips == 8
+
+
+def test_read_write_splitting() -> None:
+    db = Database(
+        "primary", ["replica1", "replica2"], balancer=RoundRobinBalancer()
+    )
+    urls = []
+    for _ in range(4):
+        with db.reader() as conn:
+            assert isinstance(conn, MockConnection)
+            urls.append(conn.url)
+    assert urls == ["replica1", "replica2", "replica1", "replica2"]
+    with db.writer() as conn:
+        assert isinstance(conn, MockConnection)
+        assert conn.url == "primary"
+    db.write("INSERT INTO products VALUES (1)")
+    assert db.primary.pool.size == 1
+    db.dispose()
+
+
+def test_least_outstanding_replica() -> None:
+    db = Database("primary", ["replica1", "replica2"])
+    with db.reader() as conn, db.reader() as conn2:
+        assert isinstance(conn, MockConnection)
+        assert isinstance(conn2, MockConnection)
+        # The busy replica is skipped
+        assert {conn.url, conn2.url} == {"replica1", "replica2"}
+    assert db.read("SELECT 1") == {"key": "value"}
+    db.dispose()
+
+
 def test_di() -> None:
     assert say_hello(1) == "Hello, John!"
+    assert say_hello.__name__ == "say_hello"
+
+
+def test_di_inject() -> None:
+    container = Container()
+    container.register(Config, lifetime=Lifetime.SINGLETON)
+
+    @container.inject
+    async def get_config(config: Config) -> Config:
+        return config
+
+    config = asyncio.run(get_config())
+    assert config is container.resolve(Config)
+    # Explicit arguments are not replaced
+    other = Config()
+    assert asyncio.run(get_config(config=other)) is other
+
+
+def test_di_inject_registered_later() -> None:
+    container = Container()
+
+    @container.inject
+    def get_repository(repository: Repository) -> Repository:
+        return repository
+
+    # Providers registered after decoration are injected too
+    container.register(Config)
+    container.register(Repository)
+    assert isinstance(get_repository(), Repository)
+
+
+class Config:
+    pass
+
+
+class Repository:
+    def __init__(self, config: Config) -> None:
+        self.config = config
+
+
+class Service:
+    def __init__(self, repository: Repository, config: Config) -> None:
+        self.repository = repository
+        self.config = config
+
+
+def test_di_lifetimes() -> None:
+    container = Container()
+    container.register(Config, lifetime=Lifetime.SINGLETON)
+    container.register(Repository, lifetime=Lifetime.SCOPED)
+    container.register(Service)
+    container.compile()
+
+    with container.scope() as scope:
+        service = scope.resolve(Service)
+        other = scope.resolve(Service)
+        assert service is not other
+        assert service.repository is other.repository
+        assert service.config is service.repository.config
+    with container.scope() as scope:
+        assert scope.resolve(Service).repository is not service.repository
+        assert scope.resolve(Config) is service.config
+    with pytest.raises(ValueError):
+        container.resolve(Repository)
+
+
+class Chicken:
+    def __init__(self, egg: "Egg") -> None: ...
+
+
+class Egg:
+    def __init__(self, chicken: Chicken) -> None: ...
+
+
+def test_di_compile_errors() -> None:
+    container = Container()
+    container.register(Chicken)
+    container.register(Egg)
+    with pytest.raises(ValueError, match="Circular dependency"):
+        container.compile()
+
+    container = Container()
+    container.register(Repository)
+    with pytest.raises(ValueError, match="No provider registered"):
+        container.compile()
+
+    # A singleton must not capture a scoped dependency through a transient one
+    container = Container()
+    container.register(Config, lifetime=Lifetime.SCOPED)
+    container.register(Repository)
+    container.register(Service, lifetime=Lifetime.SINGLETON)
+    with pytest.raises(ValueError, match="depends on scoped"):
+        container.compile()
+
+
+class Settings:
+    pass
+
+
+class Engine:
+    pass
+
+
+class Broker:
+    pass
+
+
+class App:
+    def __init__(self, engine: Engine, broker: Broker) -> None:
+        self.engine = engine
+        self.broker = broker
+
+
+def test_di_aresolve() -> None:
+    calls: list[str] = []
+
+    async def load_settings() -> Settings:
+        calls.append("settings")
+        await asyncio.sleep(0.05)
+        return Settings()
+
+    async def open_engine(settings: Settings) -> Engine:
+        await asyncio.sleep(0.05)
+        return Engine()
+
+    async def open_broker(settings: Settings) -> Broker:
+        await asyncio.sleep(0.05)
+        return Broker()
+
+    container = Container()
+    container.register(Settings, load_settings, Lifetime.SINGLETON)
+    container.register(Engine, open_engine)
+    container.register(Broker, open_broker)
+    container.register(App)
+
+    async def main() -> None:
+        start = time.monotonic()
+        apps = await asyncio.gather(
+            container.aresolve(App), container.aresolve(App)
+        )
+        # Engine and Broker are opened concurrently: two steps, not three
+        assert time.monotonic() - start < 0.14
+        assert apps[0] is not apps[1]
+        assert calls == ["settings"]
+        assert await container.aresolve(Settings) is await container.aresolve(
+            Settings
+        )
+
+    asyncio.run(main())
+    with pytest.raises(ValueError, match="aresolve"):
+        container.resolve(App)
+
+
+class Basket(Product):
+    def __init__(self) -> None:
+        super().__init__("basket", 9.99)
+        self.tags = ["gift"]
+        self.contents = {"apple": ["red", "green"]}
+
+
+class CopyOnWriteBasket(Basket):
+    pass
+
+
+def test_prototype_registry() -> None:
+    registry = PrototypeRegistry()
+    registry.register("basket", Basket())
+    basket = registry.clone("basket", price=19.99)
+    other = registry.clone("basket")
+    assert basket.price == 19.99
+    assert other.price == 9.99
+    basket.tags.append("sale")
+    basket.contents["apple"].append("yellow")
+    assert other.tags == ["gift"]
+    assert other.contents == {"apple": ["red", "green"]}
+
+    # Every prototype has its own plan, even of the same class
+    extra = Basket()
+    extra.extra = [[1]]  # type: ignore[attr-defined]
+    registry.register("extra", extra)
+    clone = registry.clone("extra")
+    clone.extra[0].append(2)
+    assert extra.extra == [[1]]  # type: ignore[attr-defined]
+    # Fields added to the prototype after registration are copied too
+    extra.late = [1]  # type: ignore[attr-defined]
+    registry.clone("extra").late.append(2)
+    assert extra.late == [1]  # type: ignore[attr-defined]
+    registry.register("cow", Basket(), copy_on_write=True)
+    assert registry.clone("cow").tags == ["gift"]
+
+    # Plain cloning isn't affected by the registry
+    assert extra.clone().extra is extra.extra  # type: ignore[attr-defined]
+
+
+def test_prototype_copy_on_write() -> None:
+    registry = PrototypeRegistry()
+    prototype = CopyOnWriteBasket()
+    registry.register("basket", prototype, copy_on_write=True)
+    basket = registry.clone("basket")
+    # Mutable fields are not copied until the clone touches them
+    assert "tags" not in vars(basket)
+    basket.tags.append("sale")
+    assert basket.tags == ["gift", "sale"]
+    assert prototype.tags == ["gift"]
+    # A clone of a clone keeps the changes
+    assert basket.clone().tags == ["gift", "sale"]
+    assert registry.clone("basket").contents == prototype.contents
+    assert isinstance(basket, CopyOnWriteBasket)
+    # The class itself is not changed
+    assert "tags" not in vars(CopyOnWriteBasket)
+    plain = CopyOnWriteBasket().clone()
+    assert plain.tags == ["gift"]
+
+
+def test_jsonable() -> None:
+    apple = Apple(price=1.25)
+    assert apple.json() == '{"name": "apple", "price": 1.25}'
+    assert Apple.from_json(apple.json()).price == 1.25
+    with pytest.raises(ValueError):
+        Apple.from_json("[]")
+    with pytest.raises(ValueError):
+        Product.from_json('{"name": "apple"}')
+    # Annotations are not enforced, an int price is still valid JSON
+    assert Apple(price=1).json() == '{"name": "apple", "price": 1}'
+    data = '{"name": "a", "price": 2}'
+    assert Apple.from_json(data).json() == data
+    assert Apple(price=True).json() == '{"name": "apple", "price": true}'
+
+    products = [apple, Orange()]
+    data = Product.dumps_many(products)
+    assert [p.name for p in Product.loads_many(data)] == ["apple", "orange"]
+
+    fp = io.StringIO()
+    Product.dump_ndjson(products, fp)
+    assert fp.getvalue().count("\n") == 2
+    fp.seek(0)
+    assert [p.price for p in Product.load_ndjson(fp)] == [1.25, 1.49]
+
+
+def test_binary() -> None:
+    products = [Apple(price=1.25), Orange(), Apple(price=0.5)]
+    data = binary.dumps(products)
+    assert len(data) < len(Product.dumps_many(products))
+
+    buffer = binary.loads(data)
+    assert len(buffer) == 3
+    assert [(p.name, p.price) for p in buffer] == [
+        ("apple", 1.25),
+        ("orange", 1.49),
+        ("apple", 0.5),
+    ]
+    assert isinstance(buffer[1], Orange)
+    assert buffer[-1].price == 0.5
+    assert [p.price for p in buffer[::2]] == [1.25, 0.5]
+    assert buffer.name(2) == "apple"
+    with pytest.raises(IndexError):
+        buffer[3]
+    with pytest.raises(ValueError):
+        binary.loads(b"JSON" + data[4:])
+
+
+@pytest.mark.parametrize("chunk_size", [None, 1, 2, 100])
+def test_builder(chunk_size: int | None) -> None:
+    builder = ProductShelfBuilder(chunk_size)
+    builder.extend(
+        Orange(f"orange {i}") if i % 2 else Apple(f"apple {i}")
+        for i in range(5)
+    )
+    shelf = builder.build("fruits")
+    assert shelf.category == "fruits"
+    assert [p.name for p in shelf] == [
+        "apple 0",
+        "apple 2",
+        "apple 4",
+        "orange 1",
+        "orange 3",
+    ]
+
+
+def test_builder_spills_runs() -> None:
+    builder = ProductShelfBuilder(chunk_size=2)
+    builder.extend(Apple(price=i) for i in range(5))
+    assert len(builder._runs) == 2
+    assert len(builder.products) == 1
+    shelf = builder.build("apples")
+    assert not isinstance(shelf.products, list)
+    assert sorted(p.price for p in shelf) == [0, 1, 2, 3, 4]
+
+    # Any product survives the spill with its extra attributes
+    builder.extend([Basket(), Basket(), Basket()])
+    baskets = list(builder.build("baskets"))
+    assert len(baskets) == 3
+    basket = baskets[0]
+    assert isinstance(basket, Basket)
+    assert basket.contents == {"apple": ["red", "green"]}
+
+    # Stopping early closes the run files
+    builder.extend(Apple(price=i) for i in range(5))
+    products = builder.build("apples").products
+    assert isinstance(products, types.GeneratorType)
+    next(products)
+    products.close()
+
+
+def test_binary_without_name_cache() -> None:
+    buffer = binary.loads(binary.dumps([Apple(), Orange()]), cache_names=False)
+    assert [p.name for p in buffer] == ["apple", "orange"]
+    assert not buffer._names
+    buffer.release()
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_columnar_shelf(
+    vectorized: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    if not vectorized:
+        monkeypatch.setattr(columnar, "np", None)
+    elif columnar.np is None:
+        pytest.skip("NumPy is not installed")
+    products = [Apple(price=1.0), Orange(price=2.0), Apple(price=3.0)]
+    shelf = ColumnarShelf.from_products("fruits", products)
+    assert len(shelf) == 3
+    assert shelf.names == ["apple", "orange"]
+    assert len(shelf.label_codes) == 3
+    assert shelf.total() == 6.0
+    assert (shelf.min_price(), shelf.max_price()) == (1.0, 3.0)
+    assert isinstance(shelf[1], Orange)
+
+    cheap = shelf.filter(0, 2)
+    assert [(p.name, p.price) for p in cheap] == [
+        ("apple", 1.0),
+        ("orange", 2.0),
+    ]
+    prices = shelf.prices
+    shelf.discount(0.5)
+    assert shelf.prices is prices
+    assert list(shelf.prices) == [0.5, 1.0, 1.5]
+    assert list(cheap.prices) == [1.0, 2.0]
+    # A filtered shelf has its own labels
+    cheap.append(Orange("blood orange"))
+    assert cheap.names == ["apple", "orange", "blood orange"]
+    assert shelf.names == ["apple", "orange"]
+    with pytest.raises(ValueError):
+        shelf.discount(2)
+
+    restored = shelf.to_shelf()
+    assert restored.category == "fruits"
+    assert [type(p) for p in restored] == [Apple, Orange, Apple]
+
+
+def test_product_registry_factory() -> None:
+    assert isinstance(simple_factory_make_product("orange"), Orange)
+    with pytest.raises(ValueError):
+        simple_factory_make_product("banana")
+
+    factory = ProductRegistryFactory(max_free=1)
+    factory.register("apple", Apple)
+    factory.register("green apple", lambda: Apple("green apple", 0.79))
+    apples = factory.make_many("green apple", 3)
+    assert len({id(apple) for apple in apples}) == 3
+    assert all(apple.name == "green apple" for apple in apples)
+    with pytest.raises(ValueError):
+        factory.make_many("banana", 1)
+
+    apple = factory.make("apple")
+    apple.price = 0.5
+    factory.release("apple", apple)
+    factory.release("apple", Apple())
+    recycled = factory.make("apple")
+    assert recycled is apple
+    assert recycled.price == 0.99
+    assert factory.make("apple") is not apple
@@ -1,17 +1,27 @@
+import asyncio
+import gc
+import io
 import logging
+import threading
+import time
 
+import pytest
 from _pytest.logging import LogCaptureFixture
 
+from src.structural.cache import Cache, LFUCache, LRUCache, TTLCache
 from src.structural.composite import Directory, File
-from src.structural.db import Database
+from src.structural.db import Database, IDatabase
 from src.structural.decorator import (
     CacheDecorator,
     measure_time,
     tracer,
 )
-from src.structural.flyweight import FlyweightFactory
+from src.structural.flyweight import FlyweightFactory, Scene
 from src.structural.locator import say_hello
 from src.structural.marker import loggable
+from src.structural.proxy import CachedDatabase
+from src.structural.single_flight import AsyncSingleFlight, SingleFlight
+from src.structural.write_behind import WriteBehind, WriteMode
 
 
 def test_cache_decorator() -> None:
@@ -23,6 +33,292 @@ def test_cache_decorator() -> None:
     assert db.hit
 
 
+def test_cache_decorator_bounded() -> None:
+    database = Database()
+    for i in range(3):
+        database.set(i, f"user {i}")
+    db = CacheDecorator(database, LRUCache(maxsize=2))
+    for i in (0, 1, 0, 2, 1):
+        db.get(i)
+    assert (db.cache.hits, db.cache.misses, db.cache.evictions) == (1, 4, 2)
+    assert len(db.cache) == 2
+
+
+@pytest.mark.parametrize("write_mode", list(WriteMode))
+def test_cache_decorator_writes(write_mode: WriteMode) -> None:
+    database = Database()
+    with CacheDecorator(database, write_mode=write_mode) as db:
+        db.set(1, "John")
+        db.get(1)
+        db.set(1, "Jane")
+        assert db.get(1) == "Jane"
+        assert db.hit == (write_mode != WriteMode.AROUND)
+        assert (1 in database.data) == (write_mode != WriteMode.BEHIND)
+    assert database.data[1] == "Jane"
+
+
+@pytest.mark.parametrize("write_mode", list(WriteMode))
+def test_cached_database_writes(write_mode: WriteMode) -> None:
+    with CachedDatabase(write_mode, batch_size=2) as db:
+        db.set(1, "John")
+        assert db.get(1) == "John"
+        db.set(1, "Jane")
+        assert db.get(1) == "Jane"
+        db.cache.clear()
+        assert db.get(1) == "Jane"
+    assert db._proxied.data == {1: "Jane"}
+
+
+class PausingDatabase(Database):
+    """Reads the value, then waits before returning it."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.read = threading.Event()
+        self.resume = threading.Event()
+
+    def get(self, id: int) -> str:
+        data = super().get(id)
+        self.read.set()
+        self.resume.wait(5)
+        return data
+
+
+@pytest.mark.parametrize("write_mode", [WriteMode.AROUND, WriteMode.THROUGH])
+@pytest.mark.parametrize("proxy", [False, True])
+def test_write_during_load(write_mode: WriteMode, proxy: bool) -> None:
+    database = PausingDatabase()
+    db: CacheDecorator | CachedDatabase
+    if proxy:
+        db = CachedDatabase(write_mode)
+        db._proxied = database
+    else:
+        db = CacheDecorator(database, write_mode=write_mode)
+    database.set(1, "John")
+    reader = threading.Thread(target=db.get, args=(1,))
+    reader.start()
+    database.read.wait(5)
+    # The load read "John" and must not cache it after this write
+    db.set(1, "Jane")
+    database.resume.set()
+    reader.join()
+    assert db.get(1) == "Jane"
+
+
+def test_cached_database_single_flight() -> None:
+    db = CachedDatabase()
+    db._proxied = SlowDatabase()
+    db._proxied.set(1, "John")
+    assert get_concurrently(db, 1) == ["John"] * 8
+    assert db._proxied.reads == 1
+
+
+def test_write_behind() -> None:
+    database = Database()
+    buffer = WriteBehind(database, batch_size=3)
+    for i in range(10):
+        buffer.set(1, f"v{i}")
+    buffer.set(2, "a")
+    assert database.data == {}
+    assert buffer.get(1) == "v9"
+    buffer.set(3, "b")
+    assert database.data == {1: "v9", 2: "a", 3: "b"}
+    assert buffer.writes == 3
+
+    buffer = WriteBehind(database, flush_interval=0.01)
+    buffer.set(4, "c")
+    deadline = time.monotonic() + 5
+    while 4 not in database.data and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert database.data[4] == "c"
+    buffer.set(5, "d")
+    buffer.close()
+    assert database.data[5] == "d"
+    with pytest.raises(RuntimeError):
+        buffer.set(6, "e")
+
+
+class SlowDatabase(Database):
+    def __init__(self) -> None:
+        super().__init__()
+        self.reads = 0
+
+    def get(self, id: int) -> str:
+        self.reads += 1
+        time.sleep(0.05)
+        return super().get(id)
+
+
+def get_concurrently(db: IDatabase, id: int, n: int = 8) -> list[str | None]:
+    barrier = threading.Barrier(n)
+    results: list[str | None] = []
+
+    def get() -> None:
+        barrier.wait()
+        try:
+            results.append(db.get(id))
+        except KeyError:
+            results.append(None)
+
+    threads = [threading.Thread(target=get) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_cache_decorator_single_flight() -> None:
+    database = SlowDatabase()
+    database.set(1, "John")
+    db = CacheDecorator(database)
+    assert get_concurrently(db, 1) == ["John"] * 8
+    assert get_concurrently(db, 2) == [None] * 8
+    assert database.reads == 2
+
+
+@pytest.mark.parametrize(
+    "cache",
+    [
+        LRUCache[int, str](maxsize=8),
+        LFUCache[int, str](maxsize=8),
+        TTLCache[int, str](ttl=60, maxsize=8),
+    ],
+)
+def test_cache_decorator_threads(cache: Cache[int, str]) -> None:
+    database = Database()
+    database.data = {i: f"user {i}" for i in range(32)}
+    db = CacheDecorator(database, cache)
+    errors: list[BaseException] = []
+
+    def get(seed: int) -> None:
+        try:
+            for i in range(2000):
+                key = (i * seed) % 32
+                assert db.get(key) == f"user {key}"
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [
+        threading.Thread(target=get, args=(seed,)) for seed in range(1, 9)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(cache) <= 8
+    assert cache.hits + cache.misses == 8 * 2000
+
+
+def test_cache_serializes_access() -> None:
+    cache = LFUCache[int, str](maxsize=8)
+    done = threading.Event()
+
+    def set() -> None:
+        cache.set(1, "a")
+        done.set()
+
+    thread = threading.Thread(target=set)
+    with cache._lock:
+        thread.start()
+        assert not done.wait(0.05)
+    thread.join()
+    assert cache.get(1) == "a"
+
+
+def test_single_flight() -> None:
+    flights = SingleFlight[int, str]()
+    assert flights.do(1, lambda: "a") == "a"
+    assert flights.do(1, lambda: "b") == "b"
+    with pytest.raises(ZeroDivisionError):
+        flights.do(1, lambda: str(1 / 0))
+    assert not flights._calls
+
+
+def test_async_single_flight() -> None:
+    flights = AsyncSingleFlight[int, str]()
+    calls = 0
+
+    async def load() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "John"
+
+    async def fail() -> str:
+        await asyncio.sleep(0.01)
+        raise KeyError(1)
+
+    async def main() -> None:
+        results = await asyncio.gather(
+            *(flights.do(1, load) for _ in range(8))
+        )
+        assert results == ["John"] * 8
+        assert calls == 1
+        errors = await asyncio.gather(
+            *(flights.do(2, fail) for _ in range(8)), return_exceptions=True
+        )
+        assert all(isinstance(error, KeyError) for error in errors)
+        assert not flights._calls
+
+    asyncio.run(main())
+
+
+def test_lru_cache() -> None:
+    cache = LRUCache[int, str](maxsize=2)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    cache.get(1)
+    cache.set(3, "c")
+    assert 2 not in cache
+    assert cache.get(1) == "a"
+    assert cache.evictions == 1
+
+
+def test_lfu_cache() -> None:
+    cache = LFUCache[int, str](maxsize=2)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    cache.get(1)
+    cache.get(1)
+    cache.get(2)
+    cache.set(3, "c")
+    assert 2 not in cache
+    cache.set(4, "d")
+    assert 3 not in cache
+    assert cache.get(1) == "a"
+    assert cache.pop(4) == "d"
+    assert len(cache) == 1
+
+
+def test_ttl_cache() -> None:
+    now = 0.0
+    cache = TTLCache[int, str](ttl=10, timer=lambda: now)
+    cache.set(1, "a")
+    now = 5
+    cache.set(2, "b")
+    assert cache.get(1) == "a"
+    now = 10
+    assert cache.get(1) is None
+    assert cache.get(2) == "b"
+    assert (len(cache), cache.evictions) == (1, 1)
+
+
+def test_cache_maxbytes() -> None:
+    cache = LRUCache[int, str](maxbytes=250)
+    cache.set(1, "a" * 50)
+    cache.set(2, "b" * 50)
+    assert len(cache) == 2
+    cache.set(1, "a" * 100)
+    assert 2 not in cache
+    assert cache.nbytes <= 250
+    cache.set(3, "c" * 500)
+    assert 3 not in cache
+    assert cache.pop(1) is not None
+    assert cache.nbytes == 0
+
+
 def test_measure_time(caplog: LogCaptureFixture) -> None:
     @measure_time()
     def plus(x: int, y: int) -> int:
@@ -83,6 +379,68 @@ def test_flyweight() -> None:
     soldier2.render("blue", 30, 40)
 
     assert soldier1 is soldier2
+    assert flyweight.stats().hit_ratio == 0.5
+
+
+def test_flyweight_threads() -> None:
+    flyweight = FlyweightFactory()
+    barrier = threading.Barrier(8)
+    characters = []
+
+    def get() -> None:
+        barrier.wait()
+        characters.append(flyweight.get_character("soldier"))
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(character) for character in characters}) == 1
+    stats = flyweight.stats()
+    assert (stats.misses, stats.size) == (1, 1)
+
+
+def test_flyweight_weak() -> None:
+    flyweight = FlyweightFactory(weak=True)
+    soldier = flyweight.get_character("soldier")
+    assert flyweight.get_character("soldier") is soldier
+    assert flyweight.stats().size == 1
+    del soldier
+    gc.collect()
+    assert flyweight.stats().size == 0
+
+
+def test_scene() -> None:
+    scene = Scene(FlyweightFactory())
+    for i in range(5):
+        scene.add("soldier", "red" if i % 2 else "blue", i, -i)
+    archer = scene.add("archer", "red", 0, 0)
+    scene.move(archer, 7, 8)
+    assert len(scene) == 6
+    assert len(scene.characters) == 2
+    assert scene.colors == ["blue", "red"]
+    assert scene.render(archer) == "Soldier at (7, 8) with color red"
+
+    fp = io.StringIO()
+    scene.render_batch(fp, chunk_size=4)
+    lines = fp.getvalue().splitlines()
+    assert lines == [scene.render(unit) for unit in range(6)]
+
+
+def test_scene_add_is_atomic() -> None:
+    scene = Scene(FlyweightFactory())
+    with pytest.raises(OverflowError):
+        scene.add("soldier", "red", 0, 2**31)
+    assert len(scene) == 0
+    assert len(scene.flyweight_ids) == len(scene.color_ids) == 0
+    assert not scene.characters
+    assert not scene.colors
+
+    scene.colors = ["gray"] * 2**16
+    with pytest.raises(OverflowError):
+        scene.add("soldier", "red", 0, 0)
+    assert len(scene.flyweight_ids) == len(scene.color_ids) == 0
 
 
 def test_marker() -> None: